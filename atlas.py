@@ -0,0 +1,107 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import types
+import pygame
+
+# Procedural sprites are rendered once, packed into a single image and described
+# by a JSON index. The index carries a hash of the drawing code and the constants it
+# reads, so a stale atlas is rebuilt automatically the next time the game starts.
+ATLAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "atlas")
+INDEX_NAME = "atlas.json"
+ATLAS_WIDTH = 512
+PADDING = 1
+
+def sprite_name(key):
+    return "-".join(str(part).replace(" ", "") for part in key)
+
+def referenced_globals(function):
+    """Module-level data (colours, sizes, ...) a function and its nested lambdas read by name"""
+    names, codes = set(), [function.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+    values = []
+    for name in sorted(names):
+        value = function.__globals__.get(name)
+        if isinstance(value, (int, float, str, bytes, tuple, list, dict, pygame.Rect)):
+            values.append((name, value))
+    return values
+
+def content_hash(entries, sources):
+    """Hash the drawing code, the constants it reads and the sprite keys it is baked for"""
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(inspect.getsource(source).encode())
+        digest.update(repr(referenced_globals(inspect.unwrap(source))).encode())
+    for key, _ in entries:
+        digest.update(repr(key).encode())
+    return digest.hexdigest()[:16]
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """Shelf-pack (name, (w, h)) pairs, tallest first. Returns positions and the atlas height"""
+    positions = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes, key=lambda item: item[1][1], reverse=True):
+        if w > width:
+            raise ValueError(f"Sprite {name} is wider than the atlas ({w} > {width})")
+        if x + w > width:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        positions[name] = (x, y, w, h)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+def bake(entries, sources, directory=ATLAS_DIR):
+    """Render every (key, builder) entry into one atlas image and write its index"""
+    surfaces = {sprite_name(key): builder() for key, builder in entries}
+    positions, height = pack([(name, surface.get_size()) for name, surface in surfaces.items()])
+    atlas = pygame.Surface((ATLAS_WIDTH, max(1, height)), pygame.SRCALPHA)
+    for name, surface in surfaces.items():
+        atlas.blit(surface, positions[name][:2])
+
+    digest = content_hash(entries, sources)
+    image_name = f"atlas-{digest}.png"
+    os.makedirs(directory, exist_ok=True)
+    for old in os.listdir(directory):
+        if old.startswith("atlas-") and old != image_name:
+            try:
+                os.remove(os.path.join(directory, old))
+            except FileNotFoundError:
+                pass # Another process baking at the same time got there first
+    # Both files are written under temporary names and renamed into place, so a process
+    # starting while another bakes never reads a half-written image or index
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".bake-", suffix=".png", delete=False) as f:
+        image_tmp = f.name
+    pygame.image.save(atlas, image_tmp)
+    os.replace(image_tmp, os.path.join(directory, image_name))
+    index = {"hash": digest, "image": image_name,
+             "sprites": {name: list(rect) for name, rect in positions.items()}}
+    with tempfile.NamedTemporaryFile("w", dir=directory, prefix=".bake-", suffix=".json", delete=False) as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(f.name, os.path.join(directory, INDEX_NAME))
+    return index
+
+def read_index(directory=ATLAS_DIR):
+    try:
+        with open(os.path.join(directory, INDEX_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load(entries, sources, directory=ATLAS_DIR):
+    """Load the atlas with a single image load, baking it first if missing or stale.
+    Returns a dict mapping each sprite key to a subsurface of the atlas."""
+    index = read_index(directory)
+    if (index is None or index.get("hash") != content_hash(entries, sources)
+            or not os.path.exists(os.path.join(directory, index["image"]))):
+        index = bake(entries, sources, directory)
+    image = pygame.image.load(os.path.join(directory, index["image"]))
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    return {key: image.subsurface(index["sprites"][sprite_name(key)]) for key, _ in entries}
@@ -0,0 +1,154 @@
+import array
+import os
+import random
+import wave
+import pygame
+
+# Sound effects are synthesised once into mixer buffers and played through a fixed
+# pool of channels, so triggering a sound never decodes, allocates or blocks.
+# Background music is written to a WAV once (off the main thread) and streamed by pygame.mixer.music.
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "audio")
+MUSIC_FILE = "music.wav"
+SAMPLE_RATE = 22050
+MIXER_BUFFER = 256  # Small buffer keeps effect latency around 10 ms
+CHANNEL_POOL_SIZE = 8
+MUSIC_VOLUME = 0.35
+
+def _square(phase):
+    return 1.0 if phase % 1.0 < 0.5 else -1.0
+
+def synth(notes, sample_rate=SAMPLE_RATE, volume=0.5):
+    """Render (start_hz, end_hz, seconds) notes as 16-bit mono samples with a decaying envelope.
+    A frequency of 0 produces noise instead of a tone."""
+    samples = array.array('h')
+    rng = random.Random(0)  # Deterministic noise so baked audio never changes between runs
+    for start_hz, end_hz, seconds in notes:
+        count = int(sample_rate * seconds)
+        phase = 0.0
+        for i in range(count):
+            t = i / count
+            envelope = (1.0 - t) ** 1.5
+            if start_hz == 0:
+                value = rng.uniform(-1.0, 1.0)
+            else:
+                phase += (start_hz + (end_hz - start_hz) * t) / sample_rate
+                value = _square(phase)
+            samples.append(int(value * envelope * volume * 32767))
+    return samples
+
+# name -> notes. Tweaking these only changes the synthesised buffers at startup.
+EFFECTS = {
+    'coin': [(988, 988, 0.06), (1319, 1319, 0.22)],
+    'stomp': [(420, 90, 0.12)],
+    'respawn': [(660, 110, 0.45)],
+    'shoot': [(0, 0, 0.09)],
+    'shockwave': [(90, 40, 0.55)],
+    'level_complete': [(523, 523, 0.12), (659, 659, 0.12), (784, 784, 0.12), (1047, 1047, 0.4)],
+}
+MUSIC_NOTES = [262, 330, 392, 330, 349, 440, 523, 440, 392, 330, 294, 330, 262, 196, 220, 247]
+
+def _to_mixer_format(samples, mixer_channels):
+    if mixer_channels == 1:
+        return samples.tobytes()
+    interleaved = array.array('h', bytes(len(samples) * 2 * mixer_channels))
+    for channel in range(mixer_channels):
+        interleaved[channel::mixer_channels] = samples
+    return interleaved.tobytes()
+
+
+class AudioEngine:
+    def __init__(self, pool_size=CHANNEL_POOL_SIZE):
+        self.pool_size = pool_size
+        self.sounds = {}
+        self.channels = []
+        self.started = []  # Play counter per channel, used to steal the oldest voice
+        self.play_count = 0
+        self.enabled = False
+        self.music_playing = False
+
+    def init(self):
+        """Open the mixer with a small buffer. Leaves the engine disabled if no audio device exists"""
+        try:
+            pygame.mixer.pre_init(SAMPLE_RATE, -16, 1, MIXER_BUFFER)
+            pygame.mixer.init()
+        except pygame.error:
+            return False
+        pygame.mixer.set_num_channels(self.pool_size)
+        pygame.mixer.set_reserved(self.pool_size)  # Keep Sound.play() from grabbing pool channels
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.pool_size)]
+        self.started = [0] * self.pool_size
+        self.enabled = True
+        return True
+
+    def preload(self):
+        """Synthesise every effect into a mixer buffer (safe to run on the prewarm thread)"""
+        if not self.enabled:
+            return
+        mixer_channels = pygame.mixer.get_init()[2]
+        for name, notes in EFFECTS.items():
+            if name not in self.sounds:
+                samples = synth(notes, pygame.mixer.get_init()[0])
+                self.sounds[name] = pygame.mixer.Sound(buffer=_to_mixer_format(samples, mixer_channels))
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        channel = self.free_channel()
+        self.play_count += 1
+        self.started[channel] = self.play_count
+        self.channels[channel].play(sound)
+
+    def free_channel(self):
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+        # Every voice is busy: steal the one that started longest ago
+        return self.started.index(min(self.started))
+
+    def prepare_music(self, directory=AUDIO_DIR):
+        """Synthesise and write the music WAV on first run (seconds of work: run it on the prewarm thread)"""
+        path = os.path.join(directory, MUSIC_FILE)
+        if self.enabled and not os.path.exists(path):
+            write_music(path)
+
+    def start_music(self, directory=AUDIO_DIR):
+        """Start the music loop if its WAV is ready. Never synthesises it, so it is safe to call every frame
+        until it returns True"""
+        if not self.enabled:
+            return False
+        if not self.music_playing:
+            path = os.path.join(directory, MUSIC_FILE)
+            if not os.path.exists(path):
+                return False
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            pygame.mixer.music.play(-1)
+            self.music_playing = True
+        return True
+
+    def stop(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+            pygame.mixer.stop()
+            self.music_playing = False
+
+def write_music(path):
+    """Write the background loop to a WAV file once so the mixer can stream it"""
+    samples = synth([(hz, hz, 0.25) for hz in MUSIC_NOTES], volume=0.3)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + ".partial" # Renamed into place, so start_music never sees a half-written file
+    with wave.open(partial, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+    os.replace(partial, path)
+
+
+engine = AudioEngine()
+
+def play(name):
+    """Fire-and-forget sound effect; a no-op until the engine is initialised and preloaded"""
+    if engine.enabled:
+        engine.play(name)
@@ -0,0 +1,136 @@
+import os
+# Benchmarks run headless: no window and no sound device needed
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import argparse
+import tempfile
+import time
+import capture
+import main
+
+FRAME_BUDGET_MS = 1000 / main.FPS
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def report(label, samples_ms):
+    mean = sum(samples_ms) / len(samples_ms)
+    print(f"{label:<16} mean {mean:7.3f} ms   p50 {percentile(samples_ms, 50):7.3f} ms   "
+          f"p99 {percentile(samples_ms, 99):7.3f} ms   max {max(samples_ms):7.3f} ms   (n={len(samples_ms)})")
+    return mean
+
+def make_game(player_specs, level=1):
+    """A game that skips the title screen and has the level loaded"""
+    game = main.Game(audio_enabled=False, player_specs=player_specs)
+    game.title_screen = False
+    game.current_level = level
+    game.setup_level(level)
+    return game
+
+def bench_bots(args):
+    """Simulate (and optionally draw) a level full of bot players"""
+    game = make_game(["bot"] * args.count, args.level)
+    update_ms, draw_ms = [], []
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        game.update()
+        middle = time.perf_counter()
+        if not args.no_draw:
+            game.draw_scene()
+        end = time.perf_counter()
+        update_ms.append((middle - start) * 1000)
+        draw_ms.append((end - middle) * 1000)
+        if game.level_complete or game.game_over:
+            game.setup_level(game.current_level)
+    print(f"{args.count} bots, level {args.level}, {args.frames} frames")
+    total = report("update", update_ms)
+    if not args.no_draw:
+        total += report("draw", draw_ms)
+    print(f"{'real-time' if total < FRAME_BUDGET_MS else 'OVER BUDGET'}: {total:.2f} ms of {FRAME_BUDGET_MS:.2f} ms")
+
+def bench_transition(args):
+    """NEXT-button latency (setup_level + first frame) with and without the overlay-time prefetch"""
+    for prefetch in (False, True):
+        samples = []
+        for level in range(1, args.levels):
+            game = make_game(main.DEFAULT_PLAYERS, level)
+            game.level_complete = True
+            if prefetch:
+                game.prefetch_level(level + 1)
+                game.level_futures[level + 1].result() # The overlay is up for far longer than a build takes
+            start = time.perf_counter()
+            game.current_level += 1
+            game.setup_level(game.current_level)
+            game.draw()
+            samples.append((time.perf_counter() - start) * 1000)
+            game.level_loader.shutdown()
+        report("prefetched" if prefetch else "synchronous", samples)
+
+def bench_restart(args):
+    """R-key restart: in-place Game.reset() versus constructing a new Game (what restart used to do)"""
+    game = make_game(main.DEFAULT_PLAYERS)
+    reset_ms, rebuild_ms = [], []
+    for _ in range(args.repeats):
+        game.title_screen = False
+        game.setup_level(1)
+        start = time.perf_counter()
+        game.reset()
+        game.draw()
+        reset_ms.append((time.perf_counter() - start) * 1000)
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        fresh = main.Game(audio_enabled=False)
+        fresh.draw()
+        rebuild_ms.append((time.perf_counter() - start) * 1000)
+        fresh.level_loader.shutdown()
+    report("reset", reset_ms)
+    report("new Game", rebuild_ms)
+
+def bench_capture(args):
+    """Frame time (simulate, draw, flip) at 60 FPS without capture and with each capture format"""
+    for fmt in (None,) + capture.FORMATS:
+        with tempfile.TemporaryDirectory() as out_dir:
+            game = make_game(["bot"] * args.count)
+            if fmt:
+                game.recorder = capture.FrameRecorder(out_dir, fmt, args.queue)
+            samples = []
+            for _ in range(args.frames):
+                start = time.perf_counter()
+                game.update()
+                game.draw()
+                samples.append((time.perf_counter() - start) * 1000)
+                if game.is_idle():
+                    game.setup_level(game.current_level)
+                game.clock.tick(main.FPS) # The writer gets the rest of the frame, as it would in game
+            report(fmt or "no capture", samples)
+            if fmt:
+                game.recorder.close()
+            game.level_loader.shutdown()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Jump Bros benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bots = commands.add_parser("bots", help="frame time with many bot players")
+    bots.add_argument("--count", type=int, default=48)
+    bots.add_argument("--frames", type=int, default=600)
+    bots.add_argument("--level", type=int, default=1)
+    bots.add_argument("--no-draw", action="store_true", help="measure simulation only")
+    bots.set_defaults(func=bench_bots)
+    transition = commands.add_parser("transition", help="level transition latency")
+    transition.add_argument("--levels", type=int, default=5, help="measure transitions into levels 2..N")
+    transition.set_defaults(func=bench_transition)
+    restart = commands.add_parser("restart", help="restart (R key) latency")
+    restart.add_argument("--repeats", type=int, default=50)
+    restart.set_defaults(func=bench_restart)
+    capture_parser = commands.add_parser("capture", help="frame time overhead of --capture")
+    capture_parser.add_argument("--count", type=int, default=8, help="bot players")
+    capture_parser.add_argument("--frames", type=int, default=300)
+    capture_parser.add_argument("--queue", type=int, default=capture.DEFAULT_QUEUE_FRAMES)
+    capture_parser.set_defaults(func=bench_capture)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.func(args)
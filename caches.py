@@ -0,0 +1,76 @@
+import threading
+import time
+
+# Surfaces are shared between the main loop and the background prewarm thread,
+# so every cache access goes through one lock.
+_lock = threading.RLock()
+_text_cache = {}
+_sprite_cache = {}
+_mask_cache = {}
+TEXT_CACHE_LIMIT = 512  # HUD strings change with the score, so keep the text cache bounded
+
+def render_text(font, text, color):
+    """Render text once and reuse the surface on later frames"""
+    key = (font, text, color)
+    with _lock:
+        surface = _text_cache.get(key)
+        if surface is None:
+            if len(_text_cache) >= TEXT_CACHE_LIMIT:
+                _text_cache.clear()
+            surface = font.render(text, True, color)
+            _text_cache[key] = surface
+        return surface
+
+def get_sprite(key, builder):
+    """Return the cached sprite for key, building it with builder() on first use"""
+    with _lock:
+        surface = _sprite_cache.get(key)
+        if surface is None:
+            surface = builder()
+            _sprite_cache[key] = surface
+        return surface
+
+def get_mask(key, builder):
+    """Return the cached collision mask for key, building it with builder() on first use.
+    Sprite masks share their sprite's key"""
+    with _lock:
+        mask = _mask_cache.get(key)
+        if mask is None:
+            mask = builder()
+            _mask_cache[key] = mask
+        return mask
+
+def put_sprites(sprites):
+    """Seed the sprite cache, e.g. with subsurfaces of the baked atlas"""
+    with _lock:
+        _sprite_cache.update(sprites)
+
+
+class StartupTimer:
+    """Records named startup milestones relative to process start"""
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self):
+        lines = ["Startup timing:"]
+        previous = self.start
+        for label, t in self.marks:
+            lines.append(f"  {label:<20} +{(t - previous) * 1000:7.1f} ms  (total {(t - self.start) * 1000:7.1f} ms)")
+            previous = t
+        return "\n".join(lines)
+
+
+def start_prewarm(jobs, on_done=None):
+    """Run cache warm-up jobs on a daemon thread so the title screen stays responsive"""
+    def worker():
+        for job in jobs:
+            job()
+        if on_done:
+            on_done()
+    thread = threading.Thread(target=worker, name="cache-prewarm", daemon=True)
+    thread.start()
+    return thread
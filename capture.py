@@ -0,0 +1,103 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import pygame
+
+# Gameplay capture for bug reports and highlight reels. Every presented frame is read
+# straight out of the display surface's pixel buffer (one memcpy, no format conversion)
+# and queued; a writer thread does the slow part (PNG encoding or disk writes). The queue
+# is bounded, so when the disk falls behind frames are dropped and counted instead of
+# stalling the game. Frame numbers are kept, so dropped frames show up as gaps.
+FORMATS = ("png", "raw")
+DEFAULT_QUEUE_FRAMES = 32  # ~3 MB each at 1024x768
+PNG_COMPRESSION = 3
+
+
+def encode_png(rgb, width, height):
+    """Minimal truecolour PNG. Unlike pygame.image.save, zlib releases the GIL while
+    compressing, so encoding on the writer thread doesn't stall the game loop"""
+    stride = width * 3
+    rows = b"".join(b"\0" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, PNG_COMPRESSION)) + chunk(b"IEND", b""))
+
+
+class FrameRecorder:
+    def __init__(self, out_dir, fmt="png", max_queue=DEFAULT_QUEUE_FRAMES):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown capture format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.frames = queue.Queue(maxsize=max_queue)
+        self.layout = None # (size, bitsize, masks, pitch) of the captured surface
+        self.frame_number = 0
+        self.written = 0
+        self.dropped = []
+        self.capture_total_ms = 0.0
+        self.capture_max_ms = 0.0
+        self.raw_file = open(os.path.join(out_dir, "capture.raw"), "wb") if fmt == "raw" else None
+        self.writer = threading.Thread(target=self.write_frames, name="capture-writer", daemon=True)
+        self.writer.start()
+
+    def capture(self, surface):
+        """Queue the surface's current pixels; called right after each display flip"""
+        start = time.perf_counter()
+        if self.layout is None:
+            self.layout = (surface.get_size(), surface.get_bitsize(), surface.get_masks(), surface.get_pitch())
+        self.frame_number += 1
+        try:
+            self.frames.put_nowait((self.frame_number, bytes(surface.get_view("1"))))
+        except queue.Full:
+            self.dropped.append(self.frame_number)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.capture_total_ms += elapsed_ms
+        self.capture_max_ms = max(self.capture_max_ms, elapsed_ms)
+
+    def write_frames(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            frame_number, pixels = item
+            if self.raw_file:
+                self.raw_file.write(pixels)
+            else:
+                size, bitsize, masks, _ = self.layout
+                frame = pygame.Surface(size, 0, bitsize, masks)
+                frame.get_buffer().write(pixels)
+                with open(os.path.join(self.out_dir, f"frame_{frame_number:06d}.png"), "wb") as f:
+                    f.write(encode_png(pygame.image.tobytes(frame, "RGB"), *size))
+            self.written += 1
+
+    def close(self):
+        """Flush the queue, write the capture index and print a summary"""
+        self.frames.put(None)
+        self.writer.join()
+        if self.raw_file:
+            self.raw_file.close()
+        index = {"format": self.fmt, "frames": self.frame_number, "written": self.written, "dropped": self.dropped}
+        if self.layout:
+            (width, height), bitsize, masks, pitch = self.layout
+            index.update(width=width, height=height, bitsize=bitsize, masks=masks, pitch=pitch)
+        with open(os.path.join(self.out_dir, "capture.json"), "w") as f:
+            json.dump(index, f, indent=1)
+        print(self.summary())
+
+    def summary(self):
+        if not self.frame_number:
+            return "Capture: no frames"
+        mean = self.capture_total_ms / self.frame_number
+        text = (f"Capture: {self.written}/{self.frame_number} frames written to {self.out_dir} "
+                f"({len(self.dropped)} dropped), {mean:.3f} ms mean / {self.capture_max_ms:.3f} ms max per frame")
+        if self.raw_file and self.layout and self.layout[2][:3] == (0xff0000, 0xff00, 0xff):
+            (width, height), _, _, pitch = self.layout
+            text += (f"\n  ffmpeg -f rawvideo -pix_fmt bgr0 -s {pitch // 4}x{height} -r 60 "
+                     f"-i {os.path.join(self.out_dir, 'capture.raw')} -vf crop={width}:{height}:0:0 capture.mp4")
+        return text
@@ -0,0 +1,133 @@
+import contextlib
+import gc
+import sys
+import time
+import tracemalloc
+
+# Frame diagnostics: per-frame and per-phase allocation tracking via tracemalloc,
+# every GC collection's generation and pause time via gc.callbacks, and a log line
+# for each slow frame that ties the two together.
+
+
+class NullDiagnostics:
+    """Stand-in used when diagnostics are off, so the game loop needs no branches"""
+    def begin_frame(self, record=True):
+        pass
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def end_frame(self):
+        pass
+
+    def record_transition(self, ms):
+        pass
+
+    def record_freeze(self, label, ms):
+        pass
+
+    def close(self):
+        pass
+
+
+class FrameDiagnostics:
+    def __init__(self, slow_frame_ms, out=None):
+        self.slow_frame_ms = slow_frame_ms
+        self.out = out or sys.stderr
+        self.frame = 0
+        self.recording = False
+        self.frame_start = 0.0
+        self.phases = []  # (name, ms, net bytes, peak bytes) for the current frame
+        self.gc_events = []  # (generation, pause ms, collected) for the current frame
+        self.gc_start = None
+        self.frames_recorded = 0
+        self.slow_frames = 0
+        self.slow_frames_with_gc = 0
+        self.gc_totals = {0: [0, 0.0], 1: [0, 0.0], 2: [0, 0.0]}  # generation -> [count, pause ms]
+        self.transitions = []
+        self.freezes = []  # (label, ms) of each freeze_heap() call
+        tracemalloc.start()
+        gc.callbacks.append(self.on_gc)
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            pause_ms = (time.perf_counter() - self.gc_start) * 1000
+            self.gc_start = None
+            generation = info["generation"]
+            self.gc_totals[generation][0] += 1
+            self.gc_totals[generation][1] += pause_ms
+            self.gc_events.append((generation, pause_ms, info["collected"]))
+
+    def begin_frame(self, record=True):
+        """Start a frame. Idle frames (blocking on menu input) are not recorded"""
+        self.frame += 1
+        self.recording = record
+        self.phases.clear()
+        self.gc_events.clear()
+        self.frame_start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            current, peak = tracemalloc.get_traced_memory()
+            self.phases.append((name, elapsed_ms, current - start_bytes, peak - start_bytes))
+
+    def end_frame(self):
+        if not self.recording:
+            return
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frames_recorded += 1
+        if frame_ms <= self.slow_frame_ms:
+            return
+        self.slow_frames += 1
+        if self.gc_events:
+            self.slow_frames_with_gc += 1
+        phases = ", ".join(f"{name} {ms:.1f}ms/+{peak / 1024:.0f}KB (net {net / 1024:+.0f}KB)"
+                           for name, ms, net, peak in self.phases)
+        per_generation = {}
+        for generation, pause_ms, collected in self.gc_events:
+            count, total_ms, freed = per_generation.get(generation, (0, 0.0, 0))
+            per_generation[generation] = (count + 1, total_ms + pause_ms, freed + collected)
+        collections = ", ".join(f"gen{gen} x{count} {ms:.2f}ms ({freed} freed)"
+                                for gen, (count, ms, freed) in sorted(per_generation.items()))
+        print(f"[diag] slow frame {self.frame}: {frame_ms:.1f}ms | {phases} | gc: {collections or 'none'}", file=self.out)
+
+    def record_transition(self, ms):
+        """Level transition latency: button click to the new level's first presented frame"""
+        self.transitions.append(ms)
+        print(f"[diag] level transition {ms:.2f}ms", file=self.out)
+
+    def record_freeze(self, label, ms):
+        """Pause taken by freeze_heap(), which happens outside the recorded frames"""
+        self.freezes.append((label, ms))
+        print(f"[diag] gc freeze ({label}) {ms:.2f}ms", file=self.out)
+
+    def close(self):
+        gc.callbacks.remove(self.on_gc)
+        tracemalloc.stop()
+        print(f"[diag] {self.frames_recorded} frames, {self.slow_frames} slow "
+              f"({self.slow_frames_with_gc} with a GC pause)", file=self.out)
+        if self.transitions:
+            print(f"[diag] {len(self.transitions)} level transitions, worst {max(self.transitions):.2f}ms", file=self.out)
+        if self.freezes:
+            print(f"[diag] {len(self.freezes)} gc freezes, worst {max(ms for _, ms in self.freezes):.2f}ms", file=self.out)
+        for generation, (count, pause_ms) in self.gc_totals.items():
+            print(f"[diag] gen{generation}: {count} collections, {pause_ms:.1f}ms total pause", file=self.out)
+
+
+def freeze_heap(generation=2):
+    """Collect up to generation, then move everything still alive out of the collector's reach.
+    A full collection (the default) is for startup; per level, collecting the young generations
+    is enough to drop the load's temporaries without a full-heap pause. Returns the pause in ms."""
+    start = time.perf_counter()
+    gc.collect(generation)
+    gc.freeze()
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,47 @@
+# Live level entities are kept in buckets: ordered sets with O(1) add and remove that
+# iterate in spawn order. Besides the coin and enemy buckets, every enemy is filed once,
+# when it spawns, under the roles its class declares (projectiles, hazards), so a system
+# only walks the entities it acts on and nothing probes types every frame.
+ROLES = ('projectiles', 'hazards')
+
+
+class Bucket:
+    def __init__(self, items=()):
+        self.items = dict.fromkeys(items)
+        self.pending = []
+
+    def add(self, item):
+        self.items[item] = None
+
+    def remove(self, item):
+        """Deferred: item stays in the bucket until flush(), so systems can remove while others iterate"""
+        self.pending.append(item)
+
+    def discard(self, item):
+        self.items.pop(item, None)
+
+    def flush(self):
+        """Drop the items removed this frame; returns them"""
+        removed = self.pending
+        if removed:
+            self.pending = []
+            for item in removed:
+                self.items.pop(item, None)
+        return removed
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.items
+
+
+def role_buckets(enemies=()):
+    buckets = {role: Bucket() for role in ROLES}
+    for enemy in enemies:
+        for role in enemy.roles:
+            buckets[role].add(enemy)
+    return buckets
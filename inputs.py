@@ -0,0 +1,117 @@
+import random
+import pygame
+
+# Every player owns an input source that turns the current frame into
+# (left, right, jump). The keyboard is sampled once per frame and shared.
+_pressed = None
+_key_source = pygame.key.get_pressed
+
+def poll():
+    """Snapshot the keyboard once per frame for all keyboard players"""
+    global _pressed
+    _pressed = _key_source()
+
+def set_key_source(source):
+    """Take key state from somewhere other than this process's window (the --split simulation process)"""
+    global _key_source
+    _key_source = source
+
+
+class KeyboardInput:
+    def __init__(self, left, right, jump, label):
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.label = label
+
+    def actions(self, player, coins, enemies):
+        keys = _pressed if _pressed is not None else pygame.key.get_pressed()
+        return keys[self.left], keys[self.right], keys[self.jump]
+
+
+class GamepadInput:
+    DEADZONE = 0.5
+
+    def __init__(self, index):
+        # The joystick subsystem is only started when someone actually plays with a pad
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+        if index >= pygame.joystick.get_count():
+            raise ValueError(f"No gamepad pad{index} ({pygame.joystick.get_count()} connected)")
+        self.joystick = pygame.joystick.Joystick(index)
+        self.label = f"Pad {index}"
+
+    def actions(self, player, coins, enemies):
+        axis = self.joystick.get_axis(0) if self.joystick.get_numaxes() else 0.0
+        hat_x = self.joystick.get_hat(0)[0] if self.joystick.get_numhats() else 0
+        left = axis < -self.DEADZONE or hat_x < 0
+        right = axis > self.DEADZONE or hat_x > 0
+        jump = self.joystick.get_numbuttons() > 0 and self.joystick.get_button(0)
+        return left, right, jump
+
+
+class BotInput:
+    """Simple coin-chasing AI: walk toward the nearest coin (or enemy), jump when it is above us or we are stuck"""
+    RETARGET_FRAMES = 45
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.label = "Bot"
+        self.reset()
+
+    def reset(self):
+        self.target = None
+        self.retarget_timer = 0
+        self.last_x = None
+        self.stuck_frames = 0
+
+    def pick_target(self, player, coins, enemies):
+        cx, cy = player.rect.center
+        distance = lambda c: (c.rect.centerx - cx) ** 2 + (c.rect.centery - cy) ** 2
+        # Collected coins and stomped enemies stay listed until the end of the frame
+        target = min((c for c in coins if not c.collected), key=distance, default=None)
+        if target is None:
+            target = min((e for e in enemies if e.alive), key=distance, default=None)
+        return target
+
+    def actions(self, player, coins, enemies):
+        self.retarget_timer -= 1
+        target_gone = self.target is not None and (getattr(self.target, 'collected', False) or not getattr(self.target, 'alive', True))
+        if self.target is None or target_gone or self.retarget_timer <= 0:
+            self.target = self.pick_target(player, coins, enemies)
+            self.retarget_timer = self.RETARGET_FRAMES + self.rng.randint(0, 15)
+        if self.target is None:
+            return False, False, False
+
+        dx = self.target.rect.centerx - player.rect.centerx
+        left, right = dx < -6, dx > 6
+        if (left or right) and self.last_x == player.x:
+            self.stuck_frames += 1
+        else:
+            self.stuck_frames = 0
+        self.last_x = player.x
+        wants_up = self.target.rect.bottom < player.rect.top - 8
+        jump = player.on_ground and (wants_up or self.stuck_frames > 10 or self.rng.random() < 0.01)
+        return left, right, jump
+
+
+class RemoteInput:
+    """Placeholder for an input source that lives in another process; render processes only need its label"""
+    def __init__(self, label):
+        self.label = label
+
+    def actions(self, player, coins, enemies):
+        return False, False, False
+
+
+def make_input(spec):
+    """Build an input source from a command line spec: wasd, arrows, pad<N> or bot"""
+    if spec == "wasd":
+        return KeyboardInput(pygame.K_a, pygame.K_d, pygame.K_w, "WASD")
+    if spec == "arrows":
+        return KeyboardInput(pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, "Arrow Keys")
+    if spec.startswith("pad") and spec[3:].isdigit() or spec == "pad":
+        return GamepadInput(int(spec[3:] or 0))
+    if spec == "bot":
+        return BotInput()
+    raise ValueError(f"Unknown player input '{spec}' (expected wasd, arrows, pad<N> or bot)")
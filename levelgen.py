@@ -0,0 +1,144 @@
+import random
+from collections import deque
+
+# Procedural layouts for endless mode. Generated layouts use the same format as
+# levels/level<N>.json, so they are built with exactly the same code as the
+# hand-made ones. Generation runs on the level loader thread, never in a frame.
+SCREEN_WIDTH = 1024
+GROUND_TOP = 718  # SCREEN_HEIGHT - 50
+TILE = 16
+PLATFORM_HEIGHT = 32
+# Reachability limits, a bit below what the jump physics allow (a single jump rises ~160px)
+MAX_RISE = 140
+MAX_GAP = 180
+MAX_ATTEMPTS = 25
+GROUND = (0, GROUND_TOP, SCREEN_WIDTH, 50)
+
+def difficulty_for(level_num, campaign_levels=5):
+    return max(1, level_num - campaign_levels)
+
+def generate(level_num, seed):
+    """One random layout for level_num; difficulty ramps with the level number"""
+    rng = random.Random(seed)
+    difficulty = difficulty_for(level_num)
+    min_width = max(64, 160 - difficulty * 12)
+    max_width = max(min_width + 32, 240 - difficulty * 12)
+
+    platforms = []
+    anchor = (SCREEN_WIDTH // 2 - 150, GROUND_TOP, 300, 50)
+    y = GROUND_TOP - rng.randint(70, 100)
+    while y > 110:
+        # Each row's first platform is placed within jumping distance of the previous row's,
+        # so there is always a path up; the rest go wherever something below can reach them
+        for _ in range(6):
+            width = rng.randrange(min_width, max_width + 1, TILE)
+            x = anchor[0] + rng.randint(-MAX_GAP // 2 - width, anchor[2] + MAX_GAP // 2)
+            x = min(max(20, x - x % TILE), SCREEN_WIDTH - width - 20)
+            rect = (x, y, width, PLATFORM_HEIGHT)
+            if not any(_overlaps(rect, other, margin=48) for other in platforms):
+                platforms.append(rect)
+                anchor = rect
+                break
+        for _ in range(rng.randint(0, 2)):
+            width = rng.randrange(min_width, max_width + 1, TILE)
+            rect = (rng.randrange(20, SCREEN_WIDTH - width - 20, TILE), y, width, PLATFORM_HEIGHT)
+            if (not any(_overlaps(rect, other, margin=48) for other in platforms)
+                    and any(_reaches(other, rect) for other in platforms + [GROUND])):
+                platforms.append(rect)
+        y -= rng.randint(90, 130)
+
+    coins = []
+    for x, top, width, _ in platforms:
+        coins.append([x + rng.randrange(0, width - 20 + 1), top - 50])
+
+    walkers = [p for p in platforms if p[2] >= 64]
+    rng.shuffle(walkers)
+    enemies = [[x + rng.randrange(0, width - 24 + 1), top - 24]
+               for x, top, width, _ in walkers[:min(len(walkers), 2 + difficulty)]]
+
+    layout = {"platforms": [list(p) for p in platforms], "coins": coins, "enemies": enemies}
+    if difficulty >= 2:
+        turret_spots = [p for p in platforms if p[2] >= 64]
+        rng.shuffle(turret_spots)
+        layout["turrets"] = [
+            {"x": x + width // 2 - 16, "y": top - 32, "health": 10 + difficulty,
+             "shoot_interval": max(45, 110 - difficulty * 8), "projectile_speed": min(8, 3 + difficulty // 2)}
+            for x, top, width, _ in turret_spots[:min(3, difficulty // 2)]]
+    # The boss is 72px tall, so it needs headroom above its platform
+    boss_spots = [p for p in platforms if p[2] >= 144
+                  and not any(_overlaps((p[0], p[1] - 80, p[2], 80), other) for other in platforms if other != p)]
+    if difficulty % 5 == 0:
+        if boss_spots:
+            x, top, width, _ = max(boss_spots, key=lambda p: p[2])
+        else: # Later levels have no platform wide enough, so the boss patrols the ground
+            x, top, width = _free_ground(platforms, 72), GROUND_TOP, 72
+        layout["boss"] = {"x": x + width // 2 - 36, "y": top - 72, "width": 72, "height": 72,
+                          "health": 20 + difficulty * 2}
+    return layout
+
+def _free_ground(platforms, size):
+    """x of a size-wide ground spot no low platform covers, as near the middle as possible"""
+    low = sorted((p[0], p[0] + p[2]) for p in platforms if p[1] + p[3] > GROUND_TOP - size)
+    spots = []
+    left = 0
+    for start, end in low + [(SCREEN_WIDTH, SCREEN_WIDTH)]:
+        if start - left >= size:
+            spots.append(min(max(left, SCREEN_WIDTH // 2 - size // 2), start - size))
+        left = max(left, end)
+    # With no gap wide enough the boss lands in a platform and validate() rejects the layout
+    return min(spots, key=lambda x: abs(x + size // 2 - SCREEN_WIDTH // 2), default=SCREEN_WIDTH // 2 - size // 2)
+
+def _reaches(a, b):
+    """Can a player standing on surface a jump onto surface b?"""
+    rise = a[1] - b[1]
+    gap = max(b[0] - (a[0] + a[2]), a[0] - (b[0] + b[2]), 0)
+    return rise <= MAX_RISE and gap <= MAX_GAP
+
+def _overlaps(a, b, margin=0):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw + margin and bx < ax + aw + margin and ay < by + bh + margin and by < ay + ah + margin
+
+def validate(layout):
+    """Every coin must sit above a standing surface that can be reached from the ground,
+    and nothing may spawn inside a platform"""
+    platforms = [tuple(p) for p in layout["platforms"]]
+    if not platforms or not layout["coins"]:
+        return False
+    surfaces = [GROUND] + platforms
+    reachable = {0}
+    queue = deque([0])
+    while queue:
+        current = surfaces[queue.popleft()]
+        for i, other in enumerate(surfaces):
+            if i in reachable:
+                continue
+            if _reaches(current, other):
+                reachable.add(i)
+                queue.append(i)
+    for cx, cy in layout["coins"]:
+        if not any(s[0] - 20 <= cx <= s[0] + s[2] and 0 <= s[1] - (cy + 20) <= MAX_RISE
+                   for i, s in enumerate(surfaces) if i in reachable):
+            return False
+        if any(_overlaps((cx, cy, 20, 20), p) for p in platforms):
+            return False
+    bodies = [(x, y, 24, 24) for x, y in layout["enemies"]]
+    bodies += [(t["x"], t["y"], 32, 32) for t in layout.get("turrets", [])]
+    if "boss" in layout:
+        boss = layout["boss"]
+        bodies.append((boss["x"], boss["y"], boss["width"], boss["height"]))
+    return not any(_overlaps(body, p) for body in bodies for p in platforms)
+
+def generate_valid(level_num, seed):
+    """Generate until a layout validates; falls back to a plain staircase that always does"""
+    for attempt in range(MAX_ATTEMPTS):
+        layout = generate(level_num, seed * MAX_ATTEMPTS + attempt)
+        if validate(layout):
+            return layout
+    return staircase(level_num)
+
+def staircase(level_num):
+    platforms = [[80 + i * 150, GROUND_TOP - 100 * (i + 1), 128, PLATFORM_HEIGHT] for i in range(6)]
+    return {"platforms": platforms,
+            "coins": [[x + 54, top - 50] for x, top, _, _ in platforms],
+            "enemies": [[x + 52, top - 24] for x, top, _, _ in platforms[:min(6, 1 + difficulty_for(level_num))]]}
@@ -0,0 +1,72 @@
+import json
+import os
+
+# Level layouts live in levels/level<N>.json so they can be tuned (and hot-reloaded)
+# without touching code. This module only deals with the data: it turns a layout
+# into platform rects and hashable entity keys, and diffs two layouts so a reload
+# only rebuilds what changed.
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+
+def level_path(level_num):
+    return os.path.join(LEVEL_DIR, f"level{level_num}.json")
+
+def load(level_num):
+    with open(level_path(level_num)) as f:
+        return json.load(f)
+
+PLATFORM_KINDS = ("oneway", "breakable")
+
+def platform_rects(layout):
+    """Platforms as [x, y, width, height] tuples, with an optional fifth kind ("oneway" or "breakable")"""
+    rects = [tuple(rect) for rect in layout.get("platforms", [])]
+    for rect in rects:
+        if len(rect) not in (4, 5) or (len(rect) == 5 and rect[4] not in PLATFORM_KINDS):
+            raise ValueError(f"Bad platform {list(rect)}: expected [x, y, width, height] and an optional kind")
+    return rects
+
+def entity_keys(layout):
+    """Coins and enemies as hashable keys, in spawn order. A changed value produces a new key"""
+    keys = [("coin", x, y) for x, y in layout.get("coins", [])]
+    keys += [("enemy", x, y) for x, y in layout.get("enemies", [])]
+    boss = layout.get("boss")
+    if boss:
+        keys.append(("boss", boss["x"], boss["y"], boss.get("width", 72), boss.get("height", 72), boss.get("health", 30)))
+    for turret in layout.get("turrets", []):
+        keys.append(("turret", turret["x"], turret["y"], turret.get("health", 15),
+                     turret.get("shoot_interval", 90), turret.get("projectile_speed", 6)))
+    for key in keys:
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in key[1:]):
+            raise ValueError(f"Bad {key[0]} {list(key[1:])}: positions and settings must be numbers")
+    return keys
+
+def diff(old_items, new_items):
+    """(removed, added) between two lists of hashable items, keeping duplicates and order"""
+    remaining = list(old_items)
+    added = []
+    for item in new_items:
+        if item in remaining:
+            remaining.remove(item)
+        else:
+            added.append(item)
+    return remaining, added
+
+
+class LevelWatcher:
+    """Polls a level file's mtime; cheap enough to call every few frames"""
+    def __init__(self, level_num):
+        self.level_num = level_num
+        self.path = level_path(level_num)
+        self.mtime = self.current_mtime()
+
+    def current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self):
+        mtime = self.current_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return True
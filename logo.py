@@ -176,12 +176,13 @@ def create_game_logo(scale=1):
     
     return logo_surface
 
-def draw_title_screen(screen, font):
+def draw_title_screen(screen, font, logo=None):
     """Draw a title screen with the logo"""
     screen.fill((92, 148, 252))  # Sky blue background
     
-    # Create and draw the logo
-    logo = create_game_logo(3)  # 3x scale for title screen
+    # Create and draw the logo (callers may pass the pre-baked one)
+    if logo is None:
+        logo = create_game_logo(3)  # 3x scale for title screen
     logo_rect = logo.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2 - 50))
     screen.blit(logo, logo_rect)
     
@@ -1,16 +1,31 @@
-import pygame
+import time
+_IMPORT_START = time.perf_counter()
+import argparse
+import os
 import sys
 import random
 import math
+from concurrent.futures import ThreadPoolExecutor
+import pygame
 from logo import draw_title_screen, create_game_logo
-
-    # Initialize Pygame
-pygame.init()
+from caches import render_text, get_sprite, get_mask, put_sprites, StartupTimer, start_prewarm
+import atlas
+import audio
+import particles
+from diagnostics import NullDiagnostics, freeze_heap
+from spatial import Broadphase
+from tilemap import Tilemap
+from entities import Bucket, role_buckets
+import inputs
+import levels
+import ui
+# Optional features (endless levels, --split, --capture, --diagnostics) import their modules where they are used
 
 # Constants
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 60
+IDLE_WAIT_MS = 500  # Max time the menu loop sleeps waiting for an event
 
 # Pixelated scaling factor
 PIXEL_SCALE = 4
@@ -24,15 +39,66 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 MARIO_RED = (228, 0, 88)
 LUIGI_GREEN = (0, 168, 68)
+# Players beyond the first two cycle through these
+PLAYER_COLORS = [MARIO_RED, LUIGI_GREEN, (0, 112, 236), (252, 152, 56), (188, 0, 188),
+                 (0, 168, 168), (136, 112, 0), (116, 116, 116)]
 SHOCKWAVE_COLOR = (255, 0, 0) # For Boss shockwave
+TURRET_COLOR_BASE = (80, 80, 80)
+TURRET_COLOR_CANNON = (40, 40, 40)
+ENEMY_COLORS = ((139, 69, 19), (160, 82, 45)) # Two-phase walk animation
+BOSS_COLOR = (100, 0, 0)
+HIT_FLASH_COLOR = WHITE
+HIT_FLASH_FRAMES = 6
+BRICK_SIZE = 16
+SOLID, ONE_WAY, BREAKABLE = 'solid', 'oneway', 'breakable' # Platform kinds; levels give the last two explicitly
+
+# Character sprites are 8-bit and palette-indexed: one surface per shape, with colour
+# variants, the walk animation and hit flashes done by swapping a palette entry before blitting.
+# Each has a colorkeyed CLEAR entry, so its collision mask is the drawn silhouette, not the rect.
+PLAYER_BODY, PLAYER_OUTLINE, PLAYER_EYE, PLAYER_CLEAR = range(4)
+ENEMY_BODY, ENEMY_OUTLINE, ENEMY_FACE, ENEMY_EYE, ENEMY_EYE_SHINE, ENEMY_FEET, ENEMY_CLEAR = range(7)
+TURRET_CLEAR, TURRET_BASE, TURRET_CANNON = range(3)
+CLEAR_COLOR = (255, 0, 255)
 
 # Game settings
 GRAVITY = 0.8
 JUMP_STRENGTH = -16
 PLAYER_SPEED = 5
+DEFAULT_PLAYERS = ["wasd", "arrows"]
+HUD_ROWS_LARGE = 4  # More players than this switch the HUD to a compact multi-column layout
+WATCH_POLL_FRAMES = 15  # How often --watch-levels checks the level file for edits
+
+def init_subsystems():
+    """Initialise only the SDL subsystems the game uses (no joystick; audio starts after the first frame)"""
+    pygame.display.init()
+    pygame.font.init()
+
+def pixels_touch(a, b):
+    """Pixel-accurate hit test between two objects with collision_mask(); callers check rects first"""
+    mask_a, (ax, ay) = a.collision_mask()
+    mask_b, (bx, by) = b.collision_mask()
+    return mask_a.overlap(mask_b, (bx - ax, by - ay)) is not None
+
+def palette_surface(size, palette):
+    """8-bit surface to draw on with palette indices instead of colours"""
+    surface = pygame.Surface(size, 0, 8)
+    surface.set_palette(palette)
+    return surface
+
+def build_cloud_sprite():
+    cloud_surface = pygame.Surface((64, 48), pygame.SRCALPHA)
+    cloud_rects = [
+        pygame.Rect(0, 32, 16, 16), pygame.Rect(16, 32, 16, 16),
+        pygame.Rect(32, 32, 16, 16), pygame.Rect(48, 32, 16, 16),
+        pygame.Rect(8, 16, 16, 16), pygame.Rect(24, 16, 16, 16),
+        pygame.Rect(40, 16, 16, 16), pygame.Rect(16, 0, 16, 16),
+        pygame.Rect(32, 0, 16, 16),
+    ]
+    for rect in cloud_rects: pygame.draw.rect(cloud_surface, WHITE, rect)
+    return cloud_surface
 
 class Player:
-    def __init__(self, x, y, color, controls):
+    def __init__(self, x, y, color, input_source, name="Player"):
         self.x = x
         self.y = y
         self.spawn_x = x  # Remember spawn position
@@ -44,30 +110,31 @@ class Player:
         self.vel_x = 0
         self.vel_y = 0
         self.on_ground = False
-        self.controls = controls
+        self.input = input_source
+        self.name = name
         self.score = 0
         self.facing_right = True
         self.lives = 3
         self.dead = False
         self.double_jump_available = True
 
-    def update(self, platforms, coins, enemies):
+    def update(self, platforms, coins, enemies, broadphase=None):
         if self.dead:
             return
 
-        keys = pygame.key.get_pressed()
+        left, right, jump = self.input.actions(self, coins, enemies)
 
         # Horizontal movement
         self.vel_x = 0
-        if keys[self.controls['left']]:
+        if left:
             self.vel_x = -PLAYER_SPEED
             self.facing_right = False
-        if keys[self.controls['right']]:
+        if right:
             self.vel_x = PLAYER_SPEED
             self.facing_right = True
 
         # Jumping
-        if keys[self.controls['jump']]:
+        if jump:
             if self.on_ground:
                 self.vel_y = JUMP_STRENGTH
                 self.on_ground = False
@@ -80,6 +147,7 @@ class Player:
         self.vel_y += GRAVITY
 
         # Update position
+        prev_bottom = self.y + self.height # Where the feet were before this frame's move, for one-way platforms
         self.x += self.vel_x
         self.y += self.vel_y
         
@@ -93,10 +161,22 @@ class Player:
             self.x = SCREEN_WIDTH - self.width
         self.rect.topleft = (self.x, self.y) # Re-update rect if x changed
 
-        # Check platform collisions
+        # Check platform collisions (the shared broadphase narrows the lists when many players are in play)
+        if broadphase:
+            platforms = broadphase.platforms_near(self.rect, self.width, self.height)
         self.on_ground = False
         for platform in platforms:
             if self.rect.colliderect(platform.rect):
+                if platform.kind == ONE_WAY:
+                    # Only solid when landing on it from above; jumps and walks pass through.
+                    # 1px of slack for the float y that the int rect truncates while standing on it
+                    if self.vel_y >= 0 and prev_bottom <= platform.rect.top + 1:
+                        self.y = platform.rect.top - self.height
+                        self.vel_y = 0
+                        self.on_ground = True
+                        self.double_jump_available = True
+                        self.rect.topleft = (self.x, self.y)
+                    continue
                 overlap_left = self.rect.right - platform.rect.left
                 overlap_right = platform.rect.right - self.rect.left
                 overlap_top = self.rect.bottom - platform.rect.top
@@ -111,6 +191,8 @@ class Player:
                 elif min_overlap == overlap_bottom and self.vel_y < 0:
                     self.y = platform.rect.bottom
                     self.vel_y = 0
+                    if platform.kind == BREAKABLE and broadphase:
+                        broadphase.broken.append(platform) # Head-butted from below
                 elif min_overlap == overlap_left and self.vel_x > 0:
                     self.x = platform.rect.left - self.width
                 elif min_overlap == overlap_right and self.vel_x < 0:
@@ -126,14 +208,19 @@ class Player:
         self.rect.topleft = (self.x, self.y) # Re-update rect after ground collision
 
         # Collect coins
-        for coin in coins[:]:
-            if self.rect.colliderect(coin.rect):
-                coins.remove(coin)
+        for coin in (broadphase.coins_near(self.rect) if broadphase else list(coins)):
+            if not coin.collected and self.rect.colliderect(coin.rect):
+                coin.collected = True
+                coins.remove(coin) # Deferred to the end of the frame
                 self.score += 100
+                audio.play('coin')
+                particles.emit('coin', coin.rect.centerx, coin.rect.centery)
 
         # Enemy collision
-        for enemy in enemies[:]:
-            if self.rect.colliderect(enemy.rect):
+        for enemy in (broadphase.enemies_near(self.rect) if broadphase else list(enemies)):
+            if not enemy.alive:
+                continue # Already stomped by another player this frame
+            if self.rect.colliderect(enemy.rect) and pixels_touch(self, enemy):
                 player_prev_bottom = self.rect.bottom - self.vel_y 
                 stomp_zone_top = enemy.rect.top + (enemy.rect.height * 0.5) # Increased stomp zone to 50%
 
@@ -141,6 +228,8 @@ class Player:
                     self.vel_y = JUMP_STRENGTH // 2
                     self.score += 200
                     enemy.hit()
+                    audio.play('stomp')
+                    particles.emit('stomp', enemy.rect.centerx, enemy.rect.top)
                     if not enemy.alive:
                         enemies.remove(enemy)
                     self.on_ground = False 
@@ -148,7 +237,26 @@ class Player:
                 else:
                     self.respawn()
 
+    def reset_for_level(self):
+        self.x = self.spawn_x
+        self.y = self.spawn_y
+        self.rect.topleft = (self.x, self.y)
+        self.vel_x = 0
+        self.vel_y = 0
+        self.on_ground = False
+        self.lives = 3
+        self.dead = False
+        self.double_jump_available = True
+        if hasattr(self.input, 'reset'):
+            self.input.reset() # Bots forget targets from the previous level
+
+    def reset(self):
+        self.reset_for_level()
+        self.score = 0
+        self.facing_right = True
+
     def respawn(self):
+        audio.play('respawn')
         self.lives -= 1
         self.score = max(0, self.score - 50)
         if self.lives <= 0:
@@ -165,53 +273,120 @@ class Player:
     def draw(self, screen):
         if self.dead:
             return
-        player_surface = pygame.Surface((self.width // PIXEL_SCALE, self.height // PIXEL_SCALE))
-        player_surface.fill(self.color)
-        pygame.draw.rect(player_surface, BLACK, (1, 0, 6, 2))
-        if self.facing_right:
-            pygame.draw.rect(player_surface, WHITE, (5, 3, 2, 2))
-            pygame.draw.rect(player_surface, BLACK, (6, 3, 1, 1))
+        screen.blit(self.get_sprite(self.facing_right), (self.x, self.y))
+
+    def get_sprite(self, facing_right):
+        key = ('player', facing_right, self.width, self.height)
+        sprite = get_sprite(key, lambda: Player.build_sprite(facing_right, self.width, self.height))
+        sprite.set_palette_at(PLAYER_BODY, self.color)
+        return sprite
+
+    def collision_mask(self):
+        key = ('player', self.facing_right, self.width, self.height)
+        return get_mask(key, lambda: pygame.mask.from_surface(self.get_sprite(self.facing_right))), self.rect.topleft
+
+    @staticmethod
+    def build_sprite(facing_right, width, height):
+        player_surface = palette_surface((width // PIXEL_SCALE, height // PIXEL_SCALE),
+                                         [MARIO_RED, BLACK, WHITE, CLEAR_COLOR])
+        player_surface.set_colorkey(CLEAR_COLOR)
+        player_surface.fill(PLAYER_BODY)
+        pygame.draw.rect(player_surface, PLAYER_OUTLINE, (1, 0, 6, 2))
+        if facing_right:
+            pygame.draw.rect(player_surface, PLAYER_EYE, (5, 3, 2, 2))
+            pygame.draw.rect(player_surface, PLAYER_OUTLINE, (6, 3, 1, 1))
         else:
-            pygame.draw.rect(player_surface, WHITE, (1, 3, 2, 2))
-            pygame.draw.rect(player_surface, BLACK, (1, 3, 1, 1))
-        pygame.draw.rect(player_surface, BLACK, (2, 6, 4, 1))
-        pygame.draw.rect(player_surface, BLACK, (1, 8, 1, 2))
-        pygame.draw.rect(player_surface, BLACK, (6, 8, 1, 2))
-        scaled_surface = pygame.transform.scale(player_surface, (self.width, self.height))
-        screen.blit(scaled_surface, (self.x, self.y))
+            pygame.draw.rect(player_surface, PLAYER_EYE, (1, 3, 2, 2))
+            pygame.draw.rect(player_surface, PLAYER_OUTLINE, (1, 3, 1, 1))
+        pygame.draw.rect(player_surface, PLAYER_OUTLINE, (2, 6, 4, 1))
+        pygame.draw.rect(player_surface, PLAYER_OUTLINE, (1, 8, 1, 2))
+        pygame.draw.rect(player_surface, PLAYER_OUTLINE, (6, 8, 1, 2))
+        # Rounded head and a gap between the legs
+        w, h = player_surface.get_size()
+        for corner in ((0, 0), (w - 1, 0)):
+            player_surface.set_at(corner, PLAYER_CLEAR)
+        pygame.draw.rect(player_surface, PLAYER_CLEAR, (2, h - 2, w - 4, 2))
+        return pygame.transform.scale(player_surface, (width, height))
 
 class Platform:
-    def __init__(self, x, y, width, height):
+    def __init__(self, x, y, width, height, kind=SOLID):
         self.rect = pygame.Rect(x, y, width, height)
+        self.kind = kind
 
-    def draw(self, screen):
-        brick_size = 16
-        for i in range(0, self.rect.width, brick_size):
-            for j in range(0, self.rect.height, brick_size):
-                brick_rect = pygame.Rect(self.rect.x + i, self.rect.y + j, brick_size, brick_size)
-                pygame.draw.rect(screen, BRICK_RED, brick_rect)
-                pygame.draw.rect(screen, (140, 12, 0), brick_rect, 2)
-                pygame.draw.rect(screen, (200, 20, 0), (brick_rect.x + 2, brick_rect.y + 2, brick_size - 4, brick_size - 4))
+    def layout_entry(self):
+        """This platform as it is written in a level file"""
+        return tuple(self.rect) if self.kind == SOLID else tuple(self.rect) + (self.kind,)
+
+    def draw_rect(self):
+        # Bricks are whole, so the last column and row can stick out past the collision rect
+        return pygame.Rect(self.rect.x, self.rect.y, -(-self.rect.width // BRICK_SIZE) * BRICK_SIZE,
+                           -(-self.rect.height // BRICK_SIZE) * BRICK_SIZE)
+
+    def draw(self, screen, offset=(0, 0)):
+        """Normally drawn once, into the tilemap's render chunks"""
+        if self.kind == SOLID:
+            brick = get_sprite(('brick', BRICK_SIZE), Platform.build_brick)
+        else:
+            brick = get_sprite(('brick', self.kind, BRICK_SIZE), lambda: Platform.build_block(self.kind))
+        x, y = self.rect.x + offset[0], self.rect.y + offset[1]
+        screen.blits([(brick, (x + i, y + j)) for i in range(0, self.rect.width, BRICK_SIZE)
+                      for j in range(0, self.rect.height, BRICK_SIZE)], doreturn=False)
+
+    @staticmethod
+    def build_block(kind):
+        if kind == ONE_WAY: # A plank: only the top of the tile is drawn
+            block = pygame.Surface((BRICK_SIZE, BRICK_SIZE), pygame.SRCALPHA)
+            pygame.draw.rect(block, (150, 90, 30), (0, 0, BRICK_SIZE, 6))
+            pygame.draw.rect(block, (90, 50, 10), (0, 0, BRICK_SIZE, 6), 1)
+            return block
+        block = pygame.Surface((BRICK_SIZE, BRICK_SIZE))
+        block.fill((228, 150, 90))
+        pygame.draw.rect(block, (140, 12, 0), block.get_rect(), 2)
+        pygame.draw.line(block, (140, 12, 0), (2, BRICK_SIZE // 2), (BRICK_SIZE - 3, BRICK_SIZE // 2))
+        return block
+
+    @staticmethod
+    def build_brick():
+        brick_surface = pygame.Surface((BRICK_SIZE, BRICK_SIZE))
+        brick_rect = brick_surface.get_rect()
+        pygame.draw.rect(brick_surface, BRICK_RED, brick_rect)
+        pygame.draw.rect(brick_surface, (140, 12, 0), brick_rect, 2)
+        pygame.draw.rect(brick_surface, (200, 20, 0), (2, 2, BRICK_SIZE - 4, BRICK_SIZE - 4))
+        return brick_surface
 
 class Coin:
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, 20, 20)
         self.animation_timer = 0
+        self.collected = False
 
     def update(self):
         self.animation_timer += 1
 
+    def frame_state(self):
+        return (self.level_key, self.animation_timer)
+
+    def apply_frame_state(self, state):
+        self.animation_timer = state[1]
+
     def draw(self, screen):
         offset = int(math.sin(self.animation_timer * 0.2) * 2)
-        coin_rect = pygame.Rect(self.rect.x, self.rect.y + offset, 20, 20)
-        pygame.draw.rect(screen, COIN_YELLOW, coin_rect)
-        pygame.draw.rect(screen, (200, 148, 0), coin_rect, 2)
-        inner_rect = pygame.Rect(coin_rect.x + 4, coin_rect.y + 4, 12, 12)
-        pygame.draw.rect(screen, (255, 220, 50), inner_rect)
-        center_rect = pygame.Rect(coin_rect.x + 8, coin_rect.y + 8, 4, 4)
-        pygame.draw.rect(screen, (200, 148, 0), center_rect)
+        screen.blit(get_sprite(('coin',), Coin.build_sprite), (self.rect.x, self.rect.y + offset))
+
+    @staticmethod
+    def build_sprite():
+        coin_surface = pygame.Surface((20, 20))
+        coin_rect = coin_surface.get_rect()
+        pygame.draw.rect(coin_surface, COIN_YELLOW, coin_rect)
+        pygame.draw.rect(coin_surface, (200, 148, 0), coin_rect, 2)
+        pygame.draw.rect(coin_surface, (255, 220, 50), (4, 4, 12, 12))
+        pygame.draw.rect(coin_surface, (200, 148, 0), (8, 8, 4, 4))
+        return coin_surface
 
 class Enemy:
+    roles = () # Entity buckets this kind is filed under besides the enemies (see entities.py)
+    is_boss = False
+
     def __init__(self, x, y, health=1):
         self.x = x
         self.y = y
@@ -223,56 +398,102 @@ class Enemy:
         self.health = health
         self.max_health = health
         self.alive = True
+        self.hit_flash = 0
+        self.patrol_min = -float('inf')
+        self.patrol_max = float('inf')
+
+    def set_patrol(self, platforms):
+        """Precompute the x range between the platforms that block this walker's row. Its y never
+        changes, so this only needs redoing when the level geometry changes"""
+        left_wall, right_wall = -float('inf'), float('inf')
+        center = self.x + self.width / 2
+        for platform in platforms:
+            rect = platform.rect
+            if platform.kind == ONE_WAY:
+                continue
+            if rect.top < self.y + self.height and rect.bottom > self.y: # Blocks this enemy's row
+                if rect.centerx < center:
+                    left_wall = max(left_wall, rect.right)
+                else:
+                    right_wall = min(right_wall, rect.left)
+        self.patrol_min = left_wall
+        self.patrol_max = right_wall - self.width
 
-    def update(self, platforms): # Standard enemies don't need players_list
+    def update(self, players_list=None): # Standard enemies don't need players_list
         if not self.alive:
             return
         self.animation_timer += 1
+        if self.hit_flash:
+            self.hit_flash -= 1
         self.x += self.vel_x
         if self.x <= 0 or self.x + self.width >= SCREEN_WIDTH:
             self.vel_x *= -1
-        self.rect.x = self.x # Update rect x before collision check
+        if self.x > self.patrol_max: # Walked into the platform on the right
+            self.x = self.patrol_max
+            self.vel_x *= -1
+        elif self.x < self.patrol_min: # ... or the one on the left
+            self.x = self.patrol_min
+            self.vel_x *= -1
+        self.rect.topleft = (self.x, self.y)
 
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                # Correctly adjust position based on original direction of movement
-                if self.vel_x > 0:  # Enemy was moving right, collided with platform's left side
-                    self.x = platform.rect.left - self.width
-                elif self.vel_x < 0:  # Enemy was moving left, collided with platform's right side
-                    self.x = platform.rect.right
-                
-                self.vel_x *= -1  # Reverse velocity *after* position correction
-                self.rect.x = self.x # Update rect x immediately after position change
-                break  # Exit loop after handling one collision
-        
-        # Ensure rect is fully updated after all x and y modifications for the frame
+    def frame_state(self):
+        return (self.level_key, self.x, self.y, self.animation_timer, self.health, self.hit_flash)
+
+    def apply_frame_state(self, state):
+        _, self.x, self.y, self.animation_timer, self.health, self.hit_flash = state[:6]
         self.rect.topleft = (self.x, self.y)
 
     def hit(self):
         self.health -= 1
+        self.hit_flash = HIT_FLASH_FRAMES
         if self.health <= 0:
             self.alive = False
 
     def draw(self, screen):
         if not self.alive:
             return
-        enemy_surface = pygame.Surface((self.width, self.height))
-        color = (139, 69, 19) if self.animation_timer % 60 < 30 else (160, 82, 45)
-        if hasattr(self, 'is_boss') and self.is_boss: # Example for boss visual differentiation
-             color = (100, 0, 0) # Darker red for main boss
-        enemy_surface.fill(color)
-        pygame.draw.rect(enemy_surface, color, (0, 0, self.width, self.height // 2))
-        pygame.draw.rect(enemy_surface, (100, 50, 10), (0, 0, self.width, self.height // 2), 2)
-        body_color = (222, 173, 98)
-        pygame.draw.rect(enemy_surface, body_color, (4, self.height // 2, self.width - 8, self.height // 2))
-        pygame.draw.rect(enemy_surface, BLACK, (4, 6, 3, 3))
-        pygame.draw.rect(enemy_surface, BLACK, (17, 6, 3, 3))
-        pygame.draw.rect(enemy_surface, WHITE, (5, 7, 1, 1))
-        pygame.draw.rect(enemy_surface, WHITE, (18, 7, 1, 1))
-        pygame.draw.rect(enemy_surface, (139, 69, 19), (2, self.height - 4, 4, 4))
-        pygame.draw.rect(enemy_surface, (139, 69, 19), (18, self.height - 4, 4, 4))
-        screen.blit(enemy_surface, (self.x, self.y))
-        
+        screen.blit(self.get_sprite(self.sprite_color()), (self.x, self.y))
+        self.draw_health_bar(screen)
+
+    def sprite_color(self):
+        if self.hit_flash:
+            return HIT_FLASH_COLOR
+        if self.is_boss: # Example for boss visual differentiation
+            return BOSS_COLOR # Darker red for main boss
+        return ENEMY_COLORS[0] if self.animation_timer % 60 < 30 else ENEMY_COLORS[1]
+
+    def get_sprite(self, color):
+        key = ('enemy', self.width, self.height)
+        sprite = get_sprite(key, lambda: Enemy.build_sprite(self.width, self.height))
+        sprite.set_palette_at(ENEMY_BODY, color)
+        return sprite
+
+    def collision_mask(self):
+        key = ('enemy', self.width, self.height)
+        return get_mask(key, lambda: pygame.mask.from_surface(self.get_sprite(ENEMY_COLORS[0]))), self.rect.topleft
+
+    @staticmethod
+    def build_sprite(width, height):
+        enemy_surface = palette_surface((width, height), [ENEMY_COLORS[0], (100, 50, 10), (222, 173, 98), BLACK,
+                                                          WHITE, (139, 69, 19), CLEAR_COLOR])
+        enemy_surface.set_colorkey(CLEAR_COLOR)
+        enemy_surface.fill(ENEMY_BODY)
+        pygame.draw.rect(enemy_surface, ENEMY_OUTLINE, (0, 0, width, height // 2), 2)
+        pygame.draw.rect(enemy_surface, ENEMY_FACE, (4, height // 2, width - 8, height // 2 - 4))
+        # Domed head, and only the feet reach the ground
+        for i in range(3):
+            pygame.draw.line(enemy_surface, ENEMY_CLEAR, (0, i), (2 - i, i))
+            pygame.draw.line(enemy_surface, ENEMY_CLEAR, (width - 3 + i, i), (width - 1, i))
+        enemy_surface.fill(ENEMY_CLEAR, (0, height - 4, width, 4))
+        pygame.draw.rect(enemy_surface, ENEMY_EYE, (4, 6, 3, 3))
+        pygame.draw.rect(enemy_surface, ENEMY_EYE, (17, 6, 3, 3))
+        pygame.draw.rect(enemy_surface, ENEMY_EYE_SHINE, (5, 7, 1, 1))
+        pygame.draw.rect(enemy_surface, ENEMY_EYE_SHINE, (18, 7, 1, 1))
+        pygame.draw.rect(enemy_surface, ENEMY_FEET, (2, height - 4, 4, 4))
+        pygame.draw.rect(enemy_surface, ENEMY_FEET, (18, height - 4, 4, 4))
+        return enemy_surface
+
+    def draw_health_bar(self, screen):
         # Draw health bar for enemies with more than 1 max_health
         if self.max_health > 1 and self.alive:
             health_bar_width_total = self.width
@@ -301,8 +522,18 @@ class Fireball:
         self.rect.y += self.vel_y
 
     def draw(self, screen):
-        pygame.draw.rect(screen, self.color, self.rect)
-        pygame.draw.rect(screen, self.outline_color, self.rect, 1)
+        pygame.draw.ellipse(screen, self.color, self.rect)
+        pygame.draw.ellipse(screen, self.outline_color, self.rect, 1)
+
+    def collision_mask(self):
+        key = ('fireball', self.width, self.height)
+        return get_mask(key, lambda: pygame.mask.from_surface(Fireball.build_shape(self.width, self.height))), self.rect.topleft
+
+    @staticmethod
+    def build_shape(width, height):
+        shape = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.ellipse(shape, WHITE, shape.get_rect())
+        return shape
 
 class Shockwave:
     def __init__(self, center_x, center_y, max_radius=100, speed=2, ring_width=8, color=SHOCKWAVE_COLOR):
@@ -326,26 +557,28 @@ class Shockwave:
              # Draw a circle with thickness (ring)
             pygame.draw.circle(screen, self.color, (self.center_x, self.center_y), int(self.current_radius), self.ring_width)
 
-    def collides_with_player(self, player_rect):
-        if not self.active:
+    def ring_rect(self):
+        radius = int(self.current_radius)
+        return pygame.Rect(self.center_x - radius, self.center_y - radius, radius * 2, radius * 2)
+
+    def collision_mask(self):
+        """Mask of the ring exactly as draw() paints it; one per radius, shared by every shockwave"""
+        radius = int(self.current_radius)
+        def build():
+            ring = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(ring, WHITE, (radius, radius), radius, self.ring_width)
+            return pygame.mask.from_surface(ring)
+        return get_mask(('shockwave', radius, self.ring_width), build), self.ring_rect().topleft
+
+    def collides_with_player(self, player):
+        if not self.active or self.current_radius < 1:
             return False
-        # Check collision between player's rect and the shockwave ring
-        # Approximate collision: check distance from player center to shockwave center
-        player_center_x = player_rect.centerx
-        player_center_y = player_rect.centery
-        dist_sq = (player_center_x - self.center_x)**2 + (player_center_y - self.center_y)**2
-        
-        # Effective radii for collision check
-        inner_radius_sq = (self.current_radius - self.ring_width / 2 - player_rect.width / 2)**2 
-        outer_radius_sq = (self.current_radius + self.ring_width / 2 + player_rect.width / 2)**2
-        
-        # Ensure radii are not negative
-        inner_radius_sq = max(0, inner_radius_sq)
-
-        return inner_radius_sq <= dist_sq <= outer_radius_sq
+        return player.rect.colliderect(self.ring_rect()) and pixels_touch(player, self)
 
 
 class TurretEnemy(Enemy):
+    roles = ('projectiles',)
+
     def __init__(self, x, y, health=15, shoot_interval=90, projectile_speed=6, width=32, height=32): # Increased size
         super().__init__(x, y, health)
         self.width = width # Apply new width
@@ -356,12 +589,35 @@ class TurretEnemy(Enemy):
         self.shoot_interval = shoot_interval
         self.fireballs = []
         self.projectile_speed = projectile_speed
-        self.turret_color_base = (80, 80, 80)
-        self.turret_color_cannon = (40, 40, 40)
         self.last_shot_direction = 1
 
-    def update(self, platforms, players_list):
+    def get_turret_sprite(self, direction):
+        key = ('turret', direction, self.width, self.height)
+        return get_sprite(key, lambda: TurretEnemy.build_sprite(direction, self.width, self.height))
+
+    @staticmethod
+    def build_sprite(direction, width, height):
+        # The cannon sticks out past the base, so the sprite starts width // 2 left of the rect
+        origin_x = width // 2
+        turret_surface = palette_surface((origin_x + width + width // 4, height),
+                                         [CLEAR_COLOR, TURRET_COLOR_BASE, TURRET_COLOR_CANNON])
+        turret_surface.fill(TURRET_CLEAR)
+        turret_surface.set_colorkey(CLEAR_COLOR)
+        pygame.draw.rect(turret_surface, TURRET_BASE, (origin_x, 0, width, height))
+        cannon_width = width
+        cannon_height = height // 2
+        cannon_y = height // 2 - cannon_height // 2
+        if direction == 1:
+            cannon_rect_visual = pygame.Rect(origin_x + width // 2 - cannon_width // 4, cannon_y, cannon_width, cannon_height)
+        else:
+            cannon_rect_visual = pygame.Rect(0, cannon_y, cannon_width, cannon_height)
+        pygame.draw.ellipse(turret_surface, TURRET_CANNON, cannon_rect_visual)
+        return turret_surface
+
+    def update(self, players_list):
         self.animation_timer += 1
+        if self.hit_flash:
+            self.hit_flash -= 1
         self.shoot_timer += 1
         if self.shoot_timer >= self.shoot_interval:
             self.shoot(players_list)
@@ -371,6 +627,19 @@ class TurretEnemy(Enemy):
             if fireball.rect.right < -SCREEN_WIDTH or fireball.rect.left > SCREEN_WIDTH * 2:
                 self.fireballs.remove(fireball)
 
+    def frame_state(self):
+        return super().frame_state() + (self.last_shot_direction, [tuple(f.rect) for f in self.fireballs])
+
+    def apply_frame_state(self, state):
+        super().apply_frame_state(state)
+        self.last_shot_direction, fireballs = state[6:]
+        del self.fireballs[len(fireballs):]
+        while len(self.fireballs) < len(fireballs):
+            self.fireballs.append(Fireball(0, 0, 0, 0))
+        for fireball, (x, y, width, height) in zip(self.fireballs, fireballs):
+            fireball.rect.update(x, y, width, height)
+            fireball.width, fireball.height = width, height
+
     def shoot(self, players_list):
         closest_player = None
         min_dist_sq = float('inf')
@@ -391,27 +660,28 @@ class TurretEnemy(Enemy):
             fireball_vel_y = 0
             fireball_x = self.rect.right if direction == 1 else self.rect.left - fb_width
             self.fireballs.append(Fireball(fireball_x, fireball_y, fireball_vel_x, fireball_vel_y, width=fb_width, height=fb_height))
+            audio.play('shoot')
+
+    def collision_mask(self):
+        direction = self.last_shot_direction
+        key = ('turret', direction, self.width, self.height)
+        return (get_mask(key, lambda: pygame.mask.from_surface(self.get_turret_sprite(direction))),
+                (self.rect.left - self.width // 2, self.rect.top))
 
     def draw(self, screen):
         if not self.alive:
             return
-        pygame.draw.rect(screen, self.turret_color_base, self.rect)
-        cannon_width = self.width
-        cannon_height = self.height // 2
-        cannon_y = self.rect.centery - cannon_height // 2
-        if self.last_shot_direction == 1:
-            cannon_rect_visual = pygame.Rect(self.rect.centerx - cannon_width // 4, cannon_y, cannon_width, cannon_height)
-        else:
-            cannon_rect_visual = pygame.Rect(self.rect.left - cannon_width // 2, cannon_y, cannon_width, cannon_height)
-        pygame.draw.ellipse(screen, self.turret_color_cannon, cannon_rect_visual)
+        screen.blit(self.get_turret_sprite(self.last_shot_direction), (self.rect.left - self.width // 2, self.rect.top))
         super().draw(screen) # To draw health bar from base Enemy class
         for fireball in self.fireballs:
             fireball.draw(screen)
 
 class BossEnemy(Enemy): # Main boss for Level 5
+    roles = ('hazards',)
+    is_boss = True
+
     def __init__(self, x, y, health=30, shockwave_interval=240, shockwave_speed=2, shockwave_radius=120): # Shockwave every 4s
         super().__init__(x, y, health)
-        self.is_boss = True # For potential visual differentiation in Enemy.draw
         self.shockwave_timer = random.randint(0, shockwave_interval)
         self.shockwave_interval = shockwave_interval
         self.shockwaves = []
@@ -419,8 +689,8 @@ class BossEnemy(Enemy): # Main boss for Level 5
         self.shockwave_max_radius = shockwave_radius
         self.vel_x = random.choice([-3, 3]) # Boss specific speed
 
-    def update(self, platforms, players_list=None): # players_list is for consistency, not used by shockwave targeting
-        super().update(platforms) # Standard enemy movement (including rect updates)
+    def update(self, players_list=None): # players_list is for consistency, not used by shockwave targeting
+        super().update() # Standard enemy movement (including rect updates)
 
         self.shockwave_timer += 1
         if self.shockwave_timer >= self.shockwave_interval:
@@ -432,368 +702,829 @@ class BossEnemy(Enemy): # Main boss for Level 5
             if not shockwave.active:
                 self.shockwaves.remove(shockwave)
 
+    def frame_state(self):
+        return super().frame_state() + ([(s.center_x, s.center_y, s.current_radius) for s in self.shockwaves],)
+
+    def apply_frame_state(self, state):
+        super().apply_frame_state(state)
+        shockwaves = state[6]
+        del self.shockwaves[len(shockwaves):]
+        while len(self.shockwaves) < len(shockwaves):
+            self.shockwaves.append(Shockwave(0, 0, max_radius=self.shockwave_max_radius))
+        for shockwave, (center_x, center_y, radius) in zip(self.shockwaves, shockwaves):
+            shockwave.center_x, shockwave.center_y, shockwave.current_radius = center_x, center_y, radius
+
     def create_shockwave(self):
         self.shockwaves.append(Shockwave(self.rect.centerx, self.rect.centery, 
                                          max_radius=self.shockwave_max_radius, 
                                          speed=self.shockwave_speed))
+        audio.play('shockwave')
+        particles.emit('shockwave', self.rect.centerx, self.rect.centery)
 
     def draw(self, screen):
         super().draw(screen) # Draw standard enemy appearance + health bar
         for shockwave in self.shockwaves:
             shockwave.draw(screen)
 
+def spawn_entity(key):
+    """Create the coin or enemy described by a levels.entity_keys() key"""
+    kind, x, y = key[:3]
+    if kind == 'coin':
+        entity = Coin(x, y)
+    elif kind == 'enemy':
+        entity = Enemy(x, y)
+    elif kind == 'boss':
+        width, height, health = key[3:]
+        entity = BossEnemy(x, y, health=health)
+        entity.width = width
+        entity.height = height
+        entity.rect = pygame.Rect(x, y, width, height)
+        entity.vel_x = random.choice([-3, 3])
+    elif kind == 'turret':
+        health, shoot_interval, projectile_speed = key[3:]
+        entity = TurretEnemy(x, y, health=health, shoot_interval=shoot_interval, projectile_speed=projectile_speed)
+    else:
+        raise ValueError(f"Unknown level entity {kind!r}")
+    entity.level_key = key
+    return entity
+
+def mirror_entities(current, states):
+    """Apply published frame states to the render process's mirrors of level entities, in place.
+    Returns None when the same entities are still there, otherwise the new list (reusing mirrors by level key)"""
+    if len(current) == len(states) and all(entity.level_key == state[0] for entity, state in zip(current, states)):
+        for entity, state in zip(current, states):
+            entity.apply_frame_state(state)
+        return None
+    spare = {}
+    for entity in current:
+        spare.setdefault(entity.level_key, []).append(entity)
+    entities = []
+    for state in states:
+        reusable = spare.get(state[0])
+        entity = reusable.pop() if reusable else spawn_entity(state[0])
+        entity.apply_frame_state(state)
+        entities.append(entity)
+    return entities
+
+def atlas_entries():
+    """Every procedurally drawn sprite that goes into the baked atlas, as (cache key, builder)"""
+    # Character sprites stay out: they are palette-indexed and tiny, and the atlas is 32-bit
+    entries = []
+    entries.append((('coin',), Coin.build_sprite))
+    entries.append((('brick', BRICK_SIZE), Platform.build_brick))
+    entries.append((('cloud',), build_cloud_sprite))
+    entries.append((('logo', 3), lambda: create_game_logo(3)))
+    return entries
+
+# Changing any of these invalidates the baked atlas
+ATLAS_SOURCES = [Coin.build_sprite, Platform.build_brick, build_cloud_sprite, create_game_logo, atlas_entries]
+
+def load_sprite_atlas():
+    try:
+        sprites = atlas.load(atlas_entries(), ATLAS_SOURCES)
+    except (OSError, pygame.error) as e:
+        # e.g. a read-only install; get_sprite builds each sprite on first use instead
+        print(f"Sprite atlas skipped: {type(e).__name__}: {e}")
+        return
+    put_sprites(sprites)
+
 class Game:
-    def __init__(self):
+    def __init__(self, startup_timer=None, audio_enabled=True, diagnostics=None, freeze_gc=False, player_specs=None,
+                 watch_levels=False, endless=False, seed=None, recorder=None):
+        init_subsystems()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Jump Bros - Nintendo-Style Multiplayer Platformer")
+        load_sprite_atlas()
         self.clock = pygame.time.Clock()
+        self.max_level = 5
+        self.player_specs = player_specs or DEFAULT_PLAYERS
+        self.players = self.create_players(self.player_specs)
+        self.watch_levels = watch_levels
+        self.watch_poll_counter = 0
+        # Levels are built (and in endless mode generated) on a loader thread ahead of time
+        self.level_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        self.level_futures = {}
+        self.transition_times = [] # ms from clicking NEXT/RESTART to the new level's first frame
+        self.endless = endless
+        self.seed = seed if seed is not None else random.randrange(1 << 30)
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.startup_timer = startup_timer
+        self.startup_reported = False
+        self.prewarm_thread = None
+        self.audio_enabled = audio_enabled
+        self.diagnostics = diagnostics or NullDiagnostics()
+        self.recorder = recorder
+        self.freeze_gc = freeze_gc
+        # Idle states (title, level complete, game over) are retained UI layers over a frozen snapshot
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 180))
+        self.menu = None
+        self.menu_state = None
+        # One frame of play, in order. Entities removed by a system stay in their buckets until
+        # collect_removed, so later systems skip them by their flags instead of rebuilding lists.
+        # It runs before check_level_end, so a level completes on the frame its last coin or enemy goes
+        self.systems = [self.update_players, self.update_movement, self.update_projectiles,
+                        self.update_hazards, self.collect_removed, self.check_level_end]
+        self.reset()
+
+    def reset(self):
+        """Back to the title screen with fresh simulation state.
+        The display, clock, fonts, sprite/text caches and loader thread are all kept, so this is near-instant."""
         self.game_over = False
         self.title_screen = True
         self.winner_text = ""
         self.current_level = 1
-        self.max_level = 5
         self.level_complete = False
-        self.players = []
-        self.player1 = Player(100, SCREEN_HEIGHT - 50 - 48, MARIO_RED, {
-            'left': pygame.K_a, 'right': pygame.K_d, 'jump': pygame.K_w
-        })
-        self.player2 = Player(300, SCREEN_HEIGHT - 50 - 48, LUIGI_GREEN, {
-            'left': pygame.K_LEFT, 'right': pygame.K_RIGHT, 'jump': pygame.K_UP,
-        })
-        self.players = [self.player1, self.player2]
-        self.setup_level(self.current_level)
-        self.font = pygame.font.Font(None, 36)
+        for player in self.players:
+            player.reset()
+        # The level is built when the title is dismissed; the loader thread usually has it ready by then
+        self.platforms = []
+        self.set_entities([], [])
+        self.tilemap = Tilemap(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.level_layout = {}
+        self.level_watcher = None
+        for level_num in [n for n in self.level_futures if n != 1]:
+            self.level_futures.pop(level_num).cancel()
+        self.prefetch_level(1)
+        self.transition_start = None
+        self.menu_state = None
+        particles.system.clear()
+
+    def create_players(self, specs):
+        """One Player per input spec, spread along the ground (P1 at x=100, P2 at x=300, ...)"""
+        spacing = 200 if len(specs) <= 2 else max(4, (SCREEN_WIDTH - 232) // (len(specs) - 1))
+        players = []
+        for i, spec in enumerate(specs):
+            name = f"Bot {i + 1}" if spec == "bot" else f"Player {i + 1}"
+            x = min(100 + i * spacing, SCREEN_WIDTH - 32)
+            players.append(Player(x, SCREEN_HEIGHT - 50 - 48, PLAYER_COLORS[i % len(PLAYER_COLORS)],
+                                  inputs.make_input(spec), name))
+        return players
+
+    def build_level(self, level_num):
+        """Construct the platforms, coins and enemies for a level without touching game state"""
+        if level_num > self.max_level: # Endless mode
+            import levelgen
+            layout = levelgen.generate_valid(level_num, self.seed * 1000 + level_num)
+        else:
+            layout = levels.load(level_num)
+        platforms = [Platform(*rect) for rect in levels.platform_rects(layout)]
+        coins = []
+        enemies = []
+        for key in levels.entity_keys(layout):
+            entity = spawn_entity(key)
+            (coins if key[0] == 'coin' else enemies).append(entity)
+        for enemy in enemies:
+            enemy.set_patrol(platforms)
+        return platforms, coins, enemies, layout
+
+    def prepare_level(self, level_num):
+        """Loader thread job: build the level, its baked tilemap, and any sprites it needs that aren't cached yet"""
+        platforms, coins, enemies, layout = self.build_level(level_num)
+        for enemy in enemies:
+            enemy.collision_mask() # Builds the sprite too
+            if isinstance(enemy, TurretEnemy):
+                enemy.get_turret_sprite(1)
+                enemy.get_turret_sprite(-1)
+        tilemap = Tilemap.build(platforms, SCREEN_WIDTH, SCREEN_HEIGHT)
+        tilemap.bake()
+        return platforms, coins, enemies, layout, tilemap
+
+    def prefetch_level(self, level_num):
+        """Start building a level on the loader thread so setup_level only has to swap it in"""
+        if level_num not in self.level_futures:
+            self.level_futures[level_num] = self.level_loader.submit(self.prepare_level, level_num)
+
+    def set_entities(self, coins, enemies):
+        self.coins = Bucket(coins)
+        self.enemies = Bucket(enemies)
+        self.enemy_roles = role_buckets(enemies)
+
+    def add_enemy(self, enemy):
+        self.enemies.add(enemy)
+        for role in enemy.roles:
+            self.enemy_roles[role].add(enemy)
+
+    def take_level(self, level_num):
+        future = self.level_futures.pop(level_num, None)
+        # Drop what was prefetched for the overlay button not taken; only the level after this one can still be used
+        for stale in [n for n in self.level_futures if n != level_num + 1]:
+            self.level_futures.pop(stale).cancel()
+        if future is None:
+            return self.prepare_level(level_num)
+        return future.result() # Normally done already; otherwise wait for it rather than building twice
 
     def setup_level(self, level_num):
-        if level_num == 1:
-            self.platforms = [
-                Platform(200, 600, 200, 32), Platform(500, 500, 150, 32),
-                Platform(700, 400, 200, 32), Platform(300, 350, 100, 32),
-                Platform(800, 250, 150, 32), Platform(50, 200, 132, 32),
-            ]
-            coin_positions = [
-                (250, 550), (550, 450), (750, 350), (350, 300), (850, 200), (100, 150)
-            ]
-            enemy_positions = [
-                (250, 576), (550, 476), (750, 376)
-            ]
-        elif level_num == 2:
-            self.platforms = [
-                Platform(150, 650, 100, 32), Platform(350, 550, 100, 32),
-                Platform(550, 450, 100, 32), Platform(750, 350, 100, 32),
-                Platform(200, 300, 120, 32), Platform(500, 200, 120, 32),
-                Platform(800, 150, 120, 32), Platform(100, 100, 100, 32),
-                Platform(195, 240, 32, 120), Platform(620, 200, 80, 32),
-            ]
-            coin_positions = [
-                (175, 600), (375, 500), (575, 400), (775, 300), (230, 250),
-                (530, 150), (830, 100), (125, 50)
-            ]
-            enemy_positions = [
-                (175, 626), (375, 526), (575, 426), (775, 326), (530, 176)
-            ]
-        elif level_num == 3:
-            self.platforms = [
-                Platform(100, 650, 80, 32), Platform(250, 600, 80, 32),
-                Platform(400, 550, 80, 32), Platform(550, 500, 80, 32),
-                Platform(700, 450, 80, 32), Platform(850, 400, 80, 32),
-                Platform(750, 300, 100, 32), Platform(500, 250, 100, 32),
-                Platform(250, 200, 100, 32), Platform(50, 150, 100, 32),
-                Platform(400, 100, 200, 32),
-            ]
-            coin_positions = [
-                (125, 600), (275, 550), (425, 500), (575, 450), (725, 400),
-                (875, 350), (775, 250), (525, 200), (275, 150), (75, 100),
-                (450, 50), (525, 50)
-            ]
-            enemy_positions = [
-                (125, 626), (275, 576), (425, 526), (575, 476), (725, 426),
-                (775, 276), (525, 226), (275, 176), (450, 76)
-            ]
-        elif level_num == 4:
-            self.platforms = [
-                Platform(50, 700, 100, 32), Platform(200, 600, 80, 32),
-                Platform(350, 500, 120, 32), Platform(500, 650, 100, 32),
-                Platform(650, 550, 80, 32), Platform(800, 450, 150, 32),
-                Platform(600, 350, 32, 100), Platform(400, 300, 100, 32),
-                Platform(200, 250, 80, 32), Platform(50, 150, 100, 32),
-            ]
-            coin_positions = [
-                (75, 650), (225, 550), (375, 450), (525, 600), (675, 500),
-                (875, 400), (608, 280), (425, 250), (225, 200), (75, 100),
-            ]
-            enemy_positions = [ # Enemy at (75,676) was removed
-                (225, 576), (375, 476), (525, 626), (675, 526),
-                (875, 426), (425, 276), (225, 226)
-            ]
-        elif level_num == 5:
-            self.platforms = [
-                Platform(50, 700, SCREEN_WIDTH - 100, 32), 
-                Platform(200, 550, 150, 32), Platform(SCREEN_WIDTH - 200 - 150, 550, 150, 32),
-                Platform(SCREEN_WIDTH // 2 - 100, 400, 200, 32), 
-                Platform(100, 236, 100, 32), Platform(SCREEN_WIDTH - 200, 236, 100, 32), 
-                Platform(SCREEN_WIDTH // 2 - 75, 252, 150, 32), 
-            ]
-            coin_positions = [
-                (100, 650), (SCREEN_WIDTH - 150, 650), (250, 500), 
-                (SCREEN_WIDTH - 250 - 50, 500), (SCREEN_WIDTH // 2, 350),
-                (125, 186), (SCREEN_WIDTH - 125 - 50, 186), (SCREEN_WIDTH // 2, 212)
-            ]
-            enemy_positions = [ # Standard enemies for level 5
-                (250, 526), (SCREEN_WIDTH - 250 - 24, 526),
-                (442, 376), (558, 376) 
-            ]
-            # Boss and Turret are added separately below
-            self.boss_enemy_data = (SCREEN_WIDTH // 2 - 36, 180, 72, 72) 
-
-        self.coins = []
-        for x, y in coin_positions:
-            self.coins.append(Coin(x, y))
-        self.enemies = []
-        for x, y in enemy_positions:
-            self.enemies.append(Enemy(x, y))
-
-        if level_num == 5 and hasattr(self, 'boss_enemy_data'):
-            bx, by, bw, bh = self.boss_enemy_data
-            boss = BossEnemy(bx, by, health=30) 
-            boss.width = bw
-            boss.height = bh
-            boss.rect = pygame.Rect(bx, by, bw, bh)
-            boss.vel_x = random.choice([-3, 3]) 
-            self.enemies.append(boss)
-
-            turret_x = SCREEN_WIDTH // 2 - 16 # Adjust x for new width (32/2 = 16)
-            turret_y = 700 - 32 # Adjust y for new height (32)
-            turret = TurretEnemy(turret_x, turret_y, health=15, shoot_interval=90, projectile_speed=4)
-            self.enemies.append(turret)
-            self.enemies.append(TurretEnemy(150, 176))
-            self.enemies.append(TurretEnemy(750, 176))
+        self.platforms, coins, enemies, self.level_layout, self.tilemap = self.take_level(level_num)
+        self.set_entities(coins, enemies)
+        if self.endless and level_num >= self.max_level:
+            self.prefetch_level(level_num + 1) # Generated while this level is played
+        if self.watch_levels:
+            self.level_watcher = levels.LevelWatcher(level_num)
+        particles.system.clear()
 
         # Reset players
         for player in self.players:
-            player.x = player.spawn_x
-            player.y = player.spawn_y
-            player.rect.topleft = (player.x, player.y)
-            player.vel_x = 0
-            player.vel_y = 0
-            player.on_ground = False
-            player.lives = 3
-            player.dead = False
-            player.double_jump_available = True
+            player.reset_for_level()
         self.game_over = False
         self.level_complete = False
+        if self.freeze_gc:
+            # The long-lived startup heap is already frozen; only this level's objects are new
+            self.diagnostics.record_freeze(f"level {level_num}", freeze_heap(1))
+
+    def poll_level_watcher(self):
+        self.watch_poll_counter += 1
+        if self.level_watcher and self.watch_poll_counter % WATCH_POLL_FRAMES == 0 and self.level_watcher.changed():
+            self.reload_level()
+
+    def reload_level(self):
+        """Apply edits to the current level file in place: only changed platforms and entities are rebuilt,
+        players keep their position, score and lives, and collected coins stay collected"""
+        start = time.perf_counter()
+        try:
+            # Build everything the new layout needs before touching the level, so a bad save changes nothing
+            layout = levels.load(self.current_level)
+            removed_platforms, added_platforms = levels.diff(levels.platform_rects(self.level_layout),
+                                                             levels.platform_rects(layout))
+            new_platforms = [Platform(*entry) for entry in added_platforms]
+            removed_keys, added_keys = levels.diff(levels.entity_keys(self.level_layout), levels.entity_keys(layout))
+            new_entities = [spawn_entity(key) for key in added_keys]
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            # Usually a half-saved or mistyped file; the next save retries
+            print(f"Level {self.current_level} reload skipped: {type(e).__name__}: {e}")
+            return
+        self.level_futures.pop(self.current_level, None)
+
+        for entry in removed_platforms:
+            platform = next((p for p in self.platforms if p.layout_entry() == entry), None)
+            if platform: # Broken blocks are already gone
+                self.platforms.remove(platform)
+                self.tilemap.remove(platform)
+        for platform in new_platforms:
+            self.platforms.append(platform)
+            self.tilemap.add(platform)
+        platforms_changed = len(removed_platforms) + len(added_platforms)
+
+        for key in removed_keys:
+            entities = self.coins if key[0] == 'coin' else self.enemies
+            entity = next((e for e in entities if e.level_key == key), None)
+            if entity: # Already collected / stomped entities are simply gone
+                entities.remove(entity)
+        self.collect_removed()
+        for key, entity in zip(added_keys, new_entities):
+            if key[0] == 'coin':
+                self.coins.add(entity)
+                continue
+            self.add_enemy(entity)
+            if not platforms_changed:
+                entity.set_patrol(self.platforms)
+        if platforms_changed:
+            for enemy in self.enemies:
+                enemy.set_patrol(self.platforms)
+
+        self.level_layout = layout
+        self.menu_state = None
+        print(f"Reloaded level {self.current_level} in {(time.perf_counter() - start) * 1000:.2f} ms: "
+              f"{platforms_changed} platform and {len(removed_keys) + len(added_keys)} entity changes")
+
+    def break_platform(self, platform):
+        self.platforms.remove(platform)
+        self.tilemap.remove(platform)
+        for enemy in self.enemies:
+            enemy.set_patrol(self.platforms)
+        audio.play('stomp')
+        particles.emit('stomp', platform.rect.centerx, platform.rect.bottom)
+
+    def has_next_level(self):
+        return self.endless or self.current_level < self.max_level
+
+    def level_label(self):
+        if self.current_level > self.max_level:
+            return f"Endless {self.current_level - self.max_level}"
+        return f"Level {self.current_level}/{self.max_level}"
+
+    def is_idle(self):
+        return self.title_screen or self.level_complete or self.game_over
+
+    def current_menu(self):
+        """The UI layer of the current idle state, built once when that state is entered"""
+        state = (self.title_screen, self.level_complete, self.game_over, self.current_level, self.winner_text)
+        if self.menu is None or self.menu_state != state:
+            self.menu = ui.UILayer(self.overlay_buttons())
+            self.menu_state = state
+        return self.menu
+
+    def overlay_buttons(self):
+        restart_label = render_text(self.font, "RESTART", WHITE)
+        if self.level_complete:
+            if self.has_next_level():
+                next_label, next_fill = render_text(self.font, "NEXT", WHITE), LUIGI_GREEN
+            else:
+                next_label, next_fill = render_text(self.small_font, "COMPLETE!", BLACK), COIN_YELLOW
+            return [
+                ui.Button('restart', (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 60, 120, 50),
+                          restart_label, MARIO_RED, WHITE, BLACK),
+                ui.Button('next', (SCREEN_WIDTH // 2 + 30, SCREEN_HEIGHT // 2 + 60, 120, 50),
+                          next_label, next_fill, WHITE, BLACK),
+            ]
+        if self.game_over:
+            return [ui.Button('restart', (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 60, 200, 50),
+                              restart_label, MARIO_RED, WHITE, BLACK)]
+        return []
+
+    def button_at(self, pos):
+        if not self.is_idle():
+            return None
+        widget = self.current_menu().widget_at(pos)
+        return widget.name if widget else None
 
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            elif event.type == pygame.KEYDOWN:
-                if self.title_screen and event.key == pygame.K_SPACE:
-                    self.title_screen = False
-                elif event.key == pygame.K_r:
-                    self.__init__()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                if self.level_complete:
-                    restart_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 60, 120, 50)
-                    next_level_button_rect = pygame.Rect(SCREEN_WIDTH // 2 + 30, SCREEN_HEIGHT // 2 + 60, 120, 50)
-                    if restart_button_rect.collidepoint(mouse_x, mouse_y):
-                        self.setup_level(self.current_level)
-                    elif next_level_button_rect.collidepoint(mouse_x, mouse_y):
-                        if self.current_level < self.max_level:
-                            self.current_level += 1
-                            self.setup_level(self.current_level)
-                        else:
-                            self.__init__()
-                elif self.game_over:
-                    restart_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 60, 200, 50)
-                    if restart_button_rect.collidepoint(mouse_x, mouse_y):
+        if self.is_idle():
+            # Sleep until something happens instead of spinning at FPS on menus
+            events = [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+        return all([self.handle_event(event) for event in events])
+
+    def handle_event(self, event):
+        """Apply one event; False means quit"""
+        if event.type == pygame.QUIT:
+            return False
+        elif event.type == pygame.KEYDOWN:
+            if self.title_screen and event.key == pygame.K_SPACE:
+                self.title_screen = False
+                self.setup_level(self.current_level)
+            elif event.key == pygame.K_r:
+                self.reset()
+        elif event.type == pygame.MOUSEMOTION:
+            if self.is_idle():
+                self.current_menu().hover(event.pos)
+        elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            if self.menu:
+                self.menu.invalidate()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            clicked = self.button_at(event.pos)
+            if clicked:
+                self.transition_start = time.perf_counter()
+            if self.level_complete:
+                if clicked == 'restart':
+                    self.setup_level(self.current_level)
+                elif clicked == 'next':
+                    if self.has_next_level():
+                        self.current_level += 1
                         self.setup_level(self.current_level)
+                    else:
+                        self.reset()
+            elif self.game_over:
+                if clicked == 'restart':
+                    self.setup_level(self.current_level)
         return True
 
     def update(self):
         if not self.title_screen and not self.game_over and not self.level_complete:
-            for player in self.players:
-                player.update(self.platforms, self.coins, self.enemies)
-            for coin in self.coins:
-                coin.update()
-
-            self.enemies = [enemy for enemy in self.enemies if enemy.alive]
-            for enemy in self.enemies:
-                if isinstance(enemy, TurretEnemy) or isinstance(enemy, BossEnemy):
-                    enemy.update(self.platforms, self.players) 
-                else:
-                    enemy.update(self.platforms)
+            for system in self.systems:
+                system()
 
-            # Projectile and Shockwave Collisions
-            for player in self.players:
+    def update_players(self):
+        inputs.poll()
+        broadphase = Broadphase(self.tilemap, self.coins, self.enemies)
+        for player in self.players:
+            player.update(self.platforms, self.coins, self.enemies, broadphase)
+        for platform in broadphase.broken:
+            if platform in self.platforms: # Two players can hit the same block in one frame
+                self.break_platform(platform)
+
+    def update_movement(self):
+        for coin in self.coins:
+            coin.update()
+        particles.system.update()
+        for enemy in self.enemies:
+            if enemy.alive: # Stomped this frame; removed at the end of it
+                enemy.update(self.players)
+
+    def update_projectiles(self):
+        for player in self.players:
+            for turret in self.enemy_roles['projectiles']:
                 if player.dead:
+                    break
+                if not turret.alive:
                     continue
-                for enemy in self.enemies:
-                    if hasattr(enemy, 'fireballs'): 
-                        for fireball in enemy.fireballs[:]: 
-                            if player.rect.colliderect(fireball.rect):
-                                player.respawn()
-                                enemy.fireballs.remove(fireball) 
-                                if player.dead: break 
-                    if isinstance(enemy, BossEnemy) and hasattr(enemy, 'shockwaves'):
-                        for shockwave in enemy.shockwaves[:]:
-                            if shockwave.active and shockwave.collides_with_player(player.rect):
-                                player.respawn()
-                                # Shockwave might hit multiple players or persist
-                                if player.dead: break 
-                if player.dead: continue # Next player if current one died
-
-            # Check for level complete or game over conditions
-            if not self.level_complete and not self.game_over:
-                objectives_cleared = (len(self.coins) == 0 and len(self.enemies) == 0)
-
-                if objectives_cleared:
-                    self.level_complete = True
-                    p1_alive = not self.player1.dead
-                    p2_alive = not self.player2.dead
-
-                    if p1_alive and not p2_alive:
-                        self.winner_text = "Player 1 Wins Level!"
-                    elif not p1_alive and p2_alive:
-                        self.winner_text = "Player 2 Wins Level!"
-                    elif p1_alive and p2_alive: # Both alive
-                        if self.player1.score > self.player2.score:
-                            self.winner_text = "Player 1 Wins Level!"
-                        elif self.player2.score > self.player1.score:
-                            self.winner_text = "Player 2 Wins Level!"
-                        else:
-                            self.winner_text = "Level Complete - Tie!"
-                    else: # Both dead, but objectives cleared (should ideally be game_over if it triggers first)
-                        self.winner_text = "Level Cleared!"
-                
-                # Game over if any player has no lives left (and not already level complete)
-                # More robust: game over if ALL players are dead. Or if one player is dead in a single player context.
-                # For 2 player, if one dies, the other can continue. If both die, then game over.
-                if not self.level_complete:
-                    num_dead_players = sum(1 for p in self.players if p.dead)
-                    if num_dead_players == len(self.players): # All players dead
-                        self.game_over = True
-                        self.winner_text = "Both Players Lost!"
-                    elif num_dead_players == 1 and len(self.players) == 2: # One player dead in 2P game
-                        # Determine winner if one player is left
-                        if self.player1.dead and not self.player2.dead:
-                             # Potentially game over if level cannot be completed by one player
-                             # For now, let the game continue until level objectives met or other player dies
-                             pass
-                        elif self.player2.dead and not self.player1.dead:
-                             pass
-
+                for fireball in turret.fireballs[:]:
+                    if player.rect.colliderect(fireball.rect) and pixels_touch(player, fireball):
+                        particles.emit('fireball', fireball.rect.centerx, fireball.rect.centery)
+                        player.respawn()
+                        turret.fireballs.remove(fireball)
+                        if player.dead: break
+
+    def update_hazards(self):
+        for player in self.players:
+            for boss in self.enemy_roles['hazards']:
+                if player.dead:
+                    break
+                if not boss.alive:
+                    continue
+                for shockwave in boss.shockwaves:
+                    if shockwave.collides_with_player(player):
+                        player.respawn()
+                        # Shockwave might hit multiple players or persist
+                        if player.dead: break
+
+    def collect_removed(self):
+        """Drop the coins and enemies collected or stomped this frame from every bucket"""
+        self.coins.flush()
+        for enemy in self.enemies.flush():
+            for role in enemy.roles:
+                self.enemy_roles[role].discard(enemy)
+
+    def check_level_end(self):
+        objectives_cleared = (len(self.coins) == 0 and len(self.enemies) == 0)
+
+        if objectives_cleared:
+            self.level_complete = True
+            audio.play('level_complete')
+            self.winner_text = self.level_winner_text()
+            # Build whatever the overlay buttons can lead to while the overlay is up
+            if self.current_level < self.max_level or self.endless:
+                self.prefetch_level(self.current_level + 1)
+            self.prefetch_level(self.current_level)
+
+        # Game over once every player is out of lives (and the level wasn't completed)
+        if not self.level_complete and all(p.dead for p in self.players):
+            self.game_over = True
+            self.winner_text = self.all_lost_text()
+            self.prefetch_level(self.current_level)
+
+    def roster(self):
+        return [(p.name, p.color, p.input.label) for p in self.players]
+
+    def frame_state(self):
+        """Plain-data copy of everything draw() needs, published by the --split simulation process"""
+        return {
+            'flags': (self.title_screen, self.level_complete, self.game_over, self.current_level,
+                      self.winner_text, self.endless),
+            'roster': self.roster(),
+            'players': [(p.x, p.y, p.facing_right, p.dead, p.score, p.lives) for p in self.players],
+            'platforms': [p.layout_entry() for p in self.platforms],
+            'coins': [coin.frame_state() for coin in self.coins],
+            'enemies': [enemy.frame_state() for enemy in self.enemies],
+            'particles': particles.system.snapshot(),
+        }
+
+    def apply_frame_state(self, state):
+        """Render process side of frame_state(): mirror the simulation so draw() works unchanged"""
+        (self.title_screen, self.level_complete, self.game_over, self.current_level,
+         self.winner_text, self.endless) = state['flags']
+        if state['roster'] != self.roster():
+            self.players = [Player(0, 0, color, inputs.RemoteInput(label), name) for name, color, label in state['roster']]
+        for player, (x, y, facing_right, dead, score, lives) in zip(self.players, state['players']):
+            player.x, player.y = x, y
+            player.rect.topleft = (x, y)
+            player.facing_right, player.dead, player.score, player.lives = facing_right, dead, score, lives
+        if state['platforms'] != [p.layout_entry() for p in self.platforms]:
+            self.platforms = [Platform(*entry) for entry in state['platforms']]
+            self.tilemap = Tilemap.build(self.platforms, SCREEN_WIDTH, SCREEN_HEIGHT)
+        coins = mirror_entities(self.coins, state['coins'])
+        enemies = mirror_entities(self.enemies, state['enemies'])
+        if coins is not None or enemies is not None: # The buckets are only rebuilt when entities come or go
+            self.set_entities(list(self.coins) if coins is None else coins,
+                              list(self.enemies) if enemies is None else enemies)
+        particles.system.restore(state['particles'])
+
+    def level_winner_text(self):
+        alive = [p for p in self.players if not p.dead]
+        if not alive: # Everyone dead, but objectives cleared (should ideally be game_over if it triggers first)
+            return "Level Cleared!"
+        best = max(p.score for p in alive)
+        leaders = [p for p in alive if p.score == best]
+        if len(leaders) > 1:
+            return "Level Complete - Tie!"
+        return f"{leaders[0].name} Wins Level!"
+
+    def all_lost_text(self):
+        if len(self.players) == 1:
+            return f"{self.players[0].name} Lost!"
+        return "Both Players Lost!" if len(self.players) == 2 else "All Players Lost!"
 
     def draw(self):
-        if self.title_screen:
-            draw_title_screen(self.screen, self.font)
-            pygame.display.flip()
+        if self.is_idle():
+            self.draw_idle()
             return
+        self.draw_scene()
+        self.present()
+        if self.transition_start is not None:
+            transition_ms = (time.perf_counter() - self.transition_start) * 1000
+            self.transition_start = None
+            self.transition_times.append(transition_ms)
+            self.diagnostics.record_transition(transition_ms)
+
+    def draw_idle(self):
+        """Menus are a pre-composited snapshot plus widgets; only widgets that changed are redrawn"""
+        menu = self.current_menu()
+        if menu.background is None:
+            if self.title_screen:
+                draw_title_screen(self.screen, self.font, get_sprite(('logo', 3), lambda: create_game_logo(3)))
+            else:
+                self.draw_scene()
+                self.draw_overlay_panel()
+            menu.set_background(self.screen.copy())
+            menu.hover(pygame.mouse.get_pos())
+        dirty = menu.draw(self.screen)
+        if dirty:
+            self.present(dirty)
+
+    def present(self, rects=None):
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        if self.recorder:
+            self.recorder.capture(self.screen)
 
+    def draw_scene(self):
         self.screen.fill(SKY_BLUE)
+        cloud = get_sprite(('cloud',), build_cloud_sprite)
         for i in range(0, SCREEN_WIDTH + 100, 200):
-            cloud_rects = [
-                pygame.Rect(i - 40, 110, 16, 16), pygame.Rect(i - 24, 110, 16, 16),
-                pygame.Rect(i - 8, 110, 16, 16), pygame.Rect(i + 8, 110, 16, 16),
-                pygame.Rect(i - 32, 94, 16, 16), pygame.Rect(i - 16, 94, 16, 16),
-                pygame.Rect(i, 94, 16, 16), pygame.Rect(i - 24, 78, 16, 16),
-                pygame.Rect(i - 8, 78, 16, 16),
-            ]
-            for rect in cloud_rects: pygame.draw.rect(self.screen, WHITE, rect)
+            self.screen.blit(cloud, (i - 40, 78))
         pygame.draw.rect(self.screen, GROUND_GREEN, (0, SCREEN_HEIGHT - 50, SCREEN_WIDTH, 50))
-        for platform in self.platforms: platform.draw(self.screen)
+        self.tilemap.draw(self.screen)
         for coin in self.coins: coin.draw(self.screen)
         for enemy in self.enemies: enemy.draw(self.screen)
         for player in self.players: player.draw(self.screen)
+        particles.system.draw(self.screen)
 
-        score1_text = self.font.render(f"Player 1: {self.player1.score} | Lives: {self.player1.lives}", True, WHITE)
-        score2_text = self.font.render(f"Player 2: {self.player2.score} | Lives: {self.player2.lives}", True, WHITE)
-        controls_text = self.font.render("P1: WASD | P2: Arrow Keys | R: Restart", True, WHITE)
-        self.screen.blit(score1_text, (10, 10))
-        self.screen.blit(score2_text, (10, 50))
+        self.draw_player_hud()
+        controls_text = render_text(self.font, self.controls_hint(), WHITE)
         self.screen.blit(controls_text, (10, SCREEN_HEIGHT - 40))
-        level_info_text = self.font.render(f"Level {self.current_level}/{self.max_level}", True, WHITE)
+        level_info_text = render_text(self.font, self.level_label(), WHITE)
         self.screen.blit(level_info_text, (SCREEN_WIDTH - 150, 10))
-        objective_text = self.font.render(f"Coins: {len(self.coins)} | Enemies: {len(self.enemies)}", True, WHITE)
+        objective_text = render_text(self.font, f"Coins: {len(self.coins)} | Enemies: {len(self.enemies)}", WHITE)
         self.screen.blit(objective_text, (SCREEN_WIDTH // 2 - 100, 10))
 
+    def draw_player_hud(self):
+        if len(self.players) <= HUD_ROWS_LARGE:
+            for i, player in enumerate(self.players):
+                text = render_text(self.font, f"{player.name}: {player.score} | Lives: {player.lives}", WHITE)
+                self.screen.blit(text, (10, 10 + 40 * i))
+            return
+        # Compact layout for crowds of bots: small font, columns of 12 rows
+        for i, player in enumerate(self.players):
+            text = render_text(self.small_font, f"{player.name}: {player.score} x{player.lives}", player.color)
+            self.screen.blit(text, (10 + 150 * (i // 12), 40 + 20 * (i % 12)))
+
+    def controls_hint(self):
+        hints = [f"P{i + 1}: {p.input.label}" for i, p in enumerate(self.players) if p.input.label != "Bot"]
+        return " | ".join(hints + ["R: Restart"])
+
+    def draw_overlay_panel(self):
+        """Static part of the level complete / game over overlay (everything but the buttons)"""
         if self.level_complete:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,180))
-            self.screen.blit(overlay, (0,0))
-            level_text_surf = self.font.render(f"Level {self.current_level} Complete!", True, COIN_YELLOW)
-            level_rect_surf = level_text_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60))
-            winner_surf = self.font.render(self.winner_text, True, WHITE)
-            winner_rect_surf = winner_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-            border_rect_ui = level_rect_surf.union(winner_rect_surf).inflate(40,20)
-            pygame.draw.rect(self.screen, WHITE, border_rect_ui)
-            pygame.draw.rect(self.screen, BLACK, border_rect_ui, 4)
-            self.screen.blit(level_text_surf, level_rect_surf)
-            self.screen.blit(winner_surf, winner_rect_surf)
-            
-            restart_btn_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 60, 120, 50)
-            next_btn_rect = pygame.Rect(SCREEN_WIDTH // 2 + 30, SCREEN_HEIGHT // 2 + 60, 120, 50)
-            pygame.draw.rect(self.screen, MARIO_RED, restart_btn_rect)
-            pygame.draw.rect(self.screen, WHITE, restart_btn_rect, 4)
-            restart_txt_surf = self.font.render("RESTART", True, WHITE)
-            self.screen.blit(restart_txt_surf, restart_txt_surf.get_rect(center=restart_btn_rect.center))
-            if self.current_level < self.max_level:
-                pygame.draw.rect(self.screen, LUIGI_GREEN, next_btn_rect)
-                pygame.draw.rect(self.screen, WHITE, next_btn_rect, 4)
-                next_txt_surf = self.font.render("NEXT", True, WHITE)
-                self.screen.blit(next_txt_surf, next_txt_surf.get_rect(center=next_btn_rect.center))
-            else:
-                pygame.draw.rect(self.screen, COIN_YELLOW, next_btn_rect)
-                pygame.draw.rect(self.screen, WHITE, next_btn_rect, 4)
-                complete_txt_surf = pygame.font.Font(None, 24).render("COMPLETE!", True, BLACK)
-                self.screen.blit(complete_txt_surf, complete_txt_surf.get_rect(center=next_btn_rect.center))
-            instr_font = pygame.font.Font(None, 24)
-            instr_surf = instr_font.render("Click buttons or press R to restart", True, WHITE)
-            self.screen.blit(instr_surf, instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 130)))
-
-        elif self.game_over: # Only show game over if not level complete
+            title_surf = self.font.render(f"Level {self.current_level} Complete!", True, COIN_YELLOW)
+            instructions = "Click buttons or press R to restart"
+        else:
             # Determine winner text if not already set by a specific condition
             if not self.winner_text: # Default game over text if not set by specific player death logic
-                if self.player1.dead and self.player2.dead: self.winner_text = "Both Players Lost!"
-                elif self.player1.dead: self.winner_text = "Player 2 Wins!"
-                elif self.player2.dead: self.winner_text = "Player 1 Wins!"
+                alive = [p for p in self.players if not p.dead]
+                if not alive: self.winner_text = self.all_lost_text()
+                elif len(alive) == 1 and len(self.players) > 1: self.winner_text = f"{alive[0].name} Wins!"
                 else: self.winner_text = "Game Over!" # Fallback
-
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,180))
-            self.screen.blit(overlay, (0,0))
-            game_over_surf = self.font.render("Game Over!", True, MARIO_RED)
-            game_over_rect_surf = game_over_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60))
-            winner_surf = self.font.render(self.winner_text, True, WHITE)
-            winner_rect_surf = winner_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-            border_rect_ui = game_over_rect_surf.union(winner_rect_surf).inflate(40,20)
-            pygame.draw.rect(self.screen, WHITE, border_rect_ui)
-            pygame.draw.rect(self.screen, BLACK, border_rect_ui, 4)
-            self.screen.blit(game_over_surf, game_over_rect_surf)
-            self.screen.blit(winner_surf, winner_rect_surf)
-
-            restart_btn_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 60, 200, 50)
-            pygame.draw.rect(self.screen, MARIO_RED, restart_btn_rect)
-            pygame.draw.rect(self.screen, WHITE, restart_btn_rect, 4)
-            restart_txt_surf = self.font.render("RESTART", True, WHITE)
-            self.screen.blit(restart_txt_surf, restart_txt_surf.get_rect(center=restart_btn_rect.center))
-            instr_font = pygame.font.Font(None, 24)
-            instr_surf = instr_font.render("Click RESTART or press R", True, WHITE)
-            self.screen.blit(instr_surf, instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 130)))
-
-        pygame.display.flip()
+            title_surf = self.font.render("Game Over!", True, MARIO_RED)
+            instructions = "Click RESTART or press R"
+
+        self.screen.blit(self.overlay, (0,0))
+        title_rect_surf = title_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60))
+        winner_surf = self.font.render(self.winner_text, True, WHITE)
+        winner_rect_surf = winner_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+        border_rect_ui = title_rect_surf.union(winner_rect_surf).inflate(40,20)
+        pygame.draw.rect(self.screen, WHITE, border_rect_ui)
+        pygame.draw.rect(self.screen, BLACK, border_rect_ui, 4)
+        self.screen.blit(title_surf, title_rect_surf)
+        self.screen.blit(winner_surf, winner_rect_surf)
+        instr_surf = self.small_font.render(instructions, True, WHITE)
+        self.screen.blit(instr_surf, instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 130)))
+
+    def start_prewarm(self):
+        """Warm sprite, text and level caches in the background while the title is shown"""
+        font_jobs = [
+            lambda: render_text(self.font, "P1: WASD | P2: Arrow Keys | R: Restart", WHITE),
+            lambda: [render_text(self.font, f"Level {n}/{self.max_level}", WHITE) for n in range(1, self.max_level + 1)],
+            lambda: [render_text(self.font, label, WHITE) for label in ("RESTART", "NEXT")],
+            lambda: render_text(self.small_font, "COMPLETE!", BLACK),
+        ]
+        sprite_jobs = [
+            lambda: [player.get_sprite(facing) for player in self.players for facing in (True, False)],
+            lambda: Enemy(0, 0).collision_mask(),
+        ]
+        def done():
+            if self.startup_timer:
+                self.startup_timer.mark("caches prewarmed")
+        audio_jobs = [audio.engine.preload, audio.engine.prepare_music]
+        self.prewarm_thread = start_prewarm(font_jobs + sprite_jobs + audio_jobs, on_done=done)
+
+    def finish_startup(self):
+        """Once the caches are warm: print the startup report, start music that waited on them and freeze the heap"""
+        if self.startup_reported or self.prewarm_thread is None or self.prewarm_thread.is_alive():
+            return
+        self.startup_reported = True
+        if self.startup_timer:
+            print(self.startup_timer.report())
+        audio.engine.start_music() # First run: the prewarm thread has only just written the music
+        if self.freeze_gc:
+            self.diagnostics.record_freeze("startup", freeze_heap())
 
     def run(self):
         running = True
+        self.draw()
+        if self.startup_timer:
+            self.startup_timer.mark("first title frame")
+        if self.audio_enabled and audio.engine.init():
+            audio.engine.start_music() # Immediate once the music WAV is cached from an earlier run
+        self.start_prewarm()
+        diagnostics = self.diagnostics
         while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
+            diagnostics.begin_frame(record=not self.is_idle())
+            with diagnostics.phase("events"):
+                running = self.handle_events()
+            with diagnostics.phase("update"):
+                self.poll_level_watcher()
+                self.update()
+            with diagnostics.phase("draw"):
+                self.draw()
+            diagnostics.end_frame()
+            self.finish_startup()
             self.clock.tick(FPS)
+        diagnostics.close()
+        if self.recorder:
+            self.recorder.close()
+        audio.engine.stop()
         pygame.quit()
         sys.exit()
 
+    def run_render(self, frames, commands=None, simulation=None):
+        """--split render loop: draw the newest frame the simulation process published.
+        Input goes to the simulation through commands and the shared key state; spectators pass no commands.
+        simulation is the child Process, watched so a crash before it can mark the buffer closed doesn't hang us"""
+        running = True
+        self.start_prewarm()
+        while running and not frames.closed():
+            if simulation is not None and not simulation.is_alive():
+                break
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type in (pygame.MOUSEMOTION, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                    self.handle_event(event) # Hover and window events are purely visual
+                elif commands is None:
+                    continue # Spectators can't play
+                elif event.type == pygame.KEYDOWN:
+                    commands.put((event.type, {'key': event.key}))
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    commands.put((event.type, {'pos': event.pos, 'button': event.button}))
+            if commands is not None:
+                frames.write_keys(pygame.key.get_pressed())
+            state = frames.read()
+            if state is not None:
+                self.apply_frame_state(state)
+            self.draw()
+            self.clock.tick(FPS)
+        if commands is not None:
+            commands.put(None)
+        if self.recorder:
+            self.recorder.close()
+        if simulation is not None and not simulation.is_alive() and simulation.exitcode:
+            raise RuntimeError(f"Simulation process exited with code {simulation.exitcode}")
+
+def run_simulation(frames_name, commands, game_options):
+    """--split simulation process: update at a fixed rate and publish every frame, never drawing"""
+    import queue
+    import sharedframe
+    os.environ["SDL_VIDEODRIVER"] = "dummy" # The window belongs to the render process
+    frames = sharedframe.FrameBuffer.attach(frames_name)
+    game = Game(**game_options)
+    inputs.set_key_source(frames.read_keys)
+    music = None
+    if game.audio_enabled and audio.engine.init():
+        music = start_prewarm([audio.engine.preload, audio.engine.prepare_music])
+    running = True
+    try:
+        while running:
+            pygame.event.pump() # Keeps gamepad state current
+            while running:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                running = command is not None and game.handle_event(pygame.event.Event(*command))
+            if music and not music.is_alive():
+                audio.engine.start_music()
+                music = None
+            game.poll_level_watcher()
+            game.update()
+            frames.publish(game.frame_state())
+            game.clock.tick(FPS)
+    finally:
+        frames.mark_closed()
+        frames.close()
+        audio.engine.stop()
+
+def run_split(game_options, recorder=None):
+    """Simulate in a child process and render in this one, so a slow draw never holds up physics"""
+    import multiprocessing
+    import sharedframe
+    frames = sharedframe.FrameBuffer.create()
+    context = multiprocessing.get_context("spawn")
+    commands = context.Queue()
+    simulation = context.Process(target=run_simulation, args=(frames.name, commands, game_options),
+                                 name="simulation", daemon=True)
+    simulation.start()
+    print(f"Simulation running in process {simulation.pid}; watch with: python main.py --spectate {frames.name}")
+    game = Game(audio_enabled=False, recorder=recorder)
+    try:
+        game.run_render(frames, commands, simulation)
+        simulation.join(timeout=2)
+    finally:
+        frames.close()
+    pygame.quit()
+
+def spectate(frames_name, recorder=None):
+    """Extra window drawing another --split game's frames"""
+    import sharedframe
+    frames = sharedframe.FrameBuffer.attach(frames_name, untrack=True)
+    game = Game(audio_enabled=False, recorder=recorder)
+    pygame.display.set_caption("Jump Bros - Spectator")
+    try:
+        game.run_render(frames)
+    finally:
+        frames.close()
+    pygame.quit()
+
+def parse_args(argv=None):
+    import capture
+    parser = argparse.ArgumentParser(description="Jump Bros - Nintendo-Style Multiplayer Platformer")
+    parser.add_argument("--startup-report", action="store_true", help="print startup timing once caches are warm")
+    parser.add_argument("--bake-atlas", action="store_true", help="bake the sprite atlas and exit")
+    parser.add_argument("--no-audio", action="store_true", help="run without sound effects and music")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="log per-phase allocations and GC pauses for every slow frame")
+    parser.add_argument("--gc-freeze", action="store_true",
+                        help="freeze the heap once caches are warm, and each level's objects after it is set up")
+    parser.add_argument("--players", default=",".join(DEFAULT_PLAYERS),
+                        help="comma separated inputs, one per player: wasd, arrows, pad<N> or bot")
+    parser.add_argument("--bots", type=int, default=0, help="add this many bot players")
+    parser.add_argument("--endless", action="store_true",
+                        help="keep going after the last level with procedurally generated ones")
+    parser.add_argument("--seed", type=int, help="seed for endless level generation")
+    parser.add_argument("--watch-levels", action="store_true",
+                        help="hot-reload the current level when its levels/level<N>.json file changes")
+    parser.add_argument("--split", action="store_true",
+                        help="run the simulation in its own process, sharing frames with this one through shared memory")
+    parser.add_argument("--spectate", metavar="NAME", help="watch a --split game through its shared frame buffer")
+    parser.add_argument("--capture", metavar="DIR", help="record every displayed frame into DIR")
+    parser.add_argument("--capture-format", choices=capture.FORMATS, default="png",
+                        help="png frame sequence, or one raw video stream (see DIR/capture.json for its layout)")
+    parser.add_argument("--capture-queue", type=int, default=capture.DEFAULT_QUEUE_FRAMES,
+                        help="frames buffered for the writer before new ones are dropped")
+    args = parser.parse_args(argv)
+    if (args.split or args.spectate) and (args.diagnostics or args.startup_report):
+        parser.error("--diagnostics and --startup-report measure the single-process loop; they can't be combined "
+                     "with --split or --spectate")
+    for spec in args.players.split(","):
+        if spec:
+            try:
+                inputs.make_input(spec)
+            except ValueError as err:
+                parser.error(f"--players: {err}")
+    return args
+
 if __name__ == "__main__":
-    game = Game()
+    args = parse_args()
+    if args.bake_atlas:
+        index = atlas.bake(atlas_entries(), ATLAS_SOURCES)
+        print(f"Baked {len(index['sprites'])} sprites to {atlas.ATLAS_DIR} ({index['image']})")
+        sys.exit()
+    startup_timer = None
+    if args.startup_report:
+        startup_timer = StartupTimer(_IMPORT_START)
+        startup_timer.mark("imports")
+    diagnostics = None
+    if args.diagnostics:
+        from diagnostics import FrameDiagnostics
+        diagnostics = FrameDiagnostics(slow_frame_ms=1000 / FPS)
+    player_specs = [spec for spec in args.players.split(",") if spec] + ["bot"] * args.bots
+    recorder = None
+    if args.capture:
+        import capture
+        recorder = capture.FrameRecorder(args.capture, args.capture_format, args.capture_queue)
+    if args.spectate:
+        spectate(args.spectate, recorder)
+        sys.exit()
+    if args.split:
+        run_split(dict(audio_enabled=not args.no_audio, freeze_gc=args.gc_freeze, player_specs=player_specs,
+                       watch_levels=args.watch_levels, endless=args.endless, seed=args.seed), recorder)
+        sys.exit()
+    game = Game(startup_timer, audio_enabled=not args.no_audio, diagnostics=diagnostics, freeze_gc=args.gc_freeze,
+                player_specs=player_specs, watch_levels=args.watch_levels, endless=args.endless, seed=args.seed,
+                recorder=recorder)
+    if startup_timer:
+        startup_timer.mark("display + fonts")
     game.run()
\ No newline at end of file
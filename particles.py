@@ -0,0 +1,140 @@
+import math
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # Particles are purely cosmetic, so they switch off without numpy
+    np = None
+
+# Particle state lives in preallocated numpy arrays (struct of arrays), is advanced
+# in one vectorised step per frame and drawn with a single Surface.blits call.
+# Dead particles are compacted to keep the live ones packed at the front.
+MAX_PARTICLES = 4096
+FADE_STEPS = 4
+
+# name -> settings. 'cap' is the hard limit of live particles per emitter.
+EMITTERS = {
+    'stomp': dict(color=(139, 69, 19), size=4, burst=16, cap=512, speed=(1.5, 4.0),
+                  angle=(math.pi, 2 * math.pi), lifetime=30, gravity=0.3),
+    'coin': dict(color=(252, 188, 0), size=3, burst=12, cap=512, speed=(0.5, 2.5),
+                 angle=(0, 2 * math.pi), lifetime=24, gravity=0.05),
+    'fireball': dict(color=(255, 100, 0), size=3, burst=20, cap=512, speed=(1.0, 5.0),
+                     angle=(0, 2 * math.pi), lifetime=20, gravity=0.15),
+    'shockwave': dict(color=(255, 0, 0), size=4, burst=48, cap=1024, speed=(3.0, 3.0),
+                      angle=(0, 2 * math.pi), lifetime=36, gravity=0.0),
+}
+EMITTER_NAMES = list(EMITTERS)
+
+
+class ParticleSystem:
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.enabled = np is not None
+        self.capacity = capacity
+        self.count = 0
+        self.sprites = None
+        if not self.enabled:
+            return
+        self.rng = np.random.default_rng()
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.int32)
+        self.kind = np.zeros(capacity, np.int32)
+        self.live_per_emitter = np.zeros(len(EMITTER_NAMES), np.int32)
+        self.gravity = np.array([EMITTERS[n]['gravity'] for n in EMITTER_NAMES], np.float32)
+        self.lifetime = np.array([EMITTERS[n]['lifetime'] for n in EMITTER_NAMES], np.int32)
+        self.half_size = np.array([EMITTERS[n]['size'] // 2 for n in EMITTER_NAMES], np.float32)
+
+    def clear(self):
+        self.count = 0
+        if self.enabled:
+            self.live_per_emitter[:] = 0
+
+    def emit(self, name, x, y):
+        if not self.enabled:
+            return
+        kind = EMITTER_NAMES.index(name)
+        emitter = EMITTERS[name]
+        n = min(emitter['burst'], emitter['cap'] - int(self.live_per_emitter[kind]), self.capacity - self.count)
+        if n <= 0:
+            return
+        live = slice(self.count, self.count + n)
+        angles = self.rng.uniform(*emitter['angle'], n)
+        speeds = self.rng.uniform(*emitter['speed'], n)
+        self.pos[live] = (x, y)
+        self.vel[live, 0] = np.cos(angles) * speeds
+        self.vel[live, 1] = np.sin(angles) * speeds
+        self.life[live] = emitter['lifetime']
+        self.kind[live] = kind
+        self.count += n
+        self.live_per_emitter[kind] += n
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        kind = self.kind[:n]
+        self.vel[:n, 1] += self.gravity[kind]
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        m = len(keep)
+        self.pos[:m] = self.pos[keep]
+        self.vel[:m] = self.vel[keep]
+        self.life[:m] = self.life[keep]
+        self.kind[:m] = self.kind[keep]
+        self.count = m
+        self.live_per_emitter[:] = np.bincount(self.kind[:m], minlength=len(EMITTER_NAMES))
+
+    def snapshot(self):
+        """Live particles as plain arrays, for drawing them in another process"""
+        n = self.count
+        if not n:
+            return None
+        return self.pos[:n].copy(), self.life[:n].copy(), self.kind[:n].copy()
+
+    def restore(self, snapshot):
+        if not self.enabled:
+            return
+        if snapshot is None:
+            self.count = 0
+            return
+        pos, life, kind = snapshot
+        n = len(life)
+        self.pos[:n] = pos
+        self.life[:n] = life
+        self.kind[:n] = kind
+        self.count = n
+
+    def build_sprites(self):
+        """One small square per emitter and fade step, indexed kind * FADE_STEPS + step"""
+        sprites = []
+        for name in EMITTER_NAMES:
+            emitter = EMITTERS[name]
+            for step in range(FADE_STEPS):
+                sprite = pygame.Surface((emitter['size'], emitter['size']))
+                sprite.fill(emitter['color'])
+                sprite.set_alpha(255 * (step + 1) // FADE_STEPS)
+                sprites.append(sprite)
+        return sprites
+
+    def draw(self, screen):
+        n = self.count
+        if not n:
+            return
+        if self.sprites is None:
+            self.sprites = self.build_sprites()
+        kind = self.kind[:n]
+        step = np.minimum(self.life[:n] * FADE_STEPS // self.lifetime[kind], FADE_STEPS - 1)
+        sprite_ids = (kind * FADE_STEPS + step).tolist()
+        positions = (self.pos[:n] - self.half_size[kind, None]).astype(np.int32).tolist()
+        screen.blits(zip(map(self.sprites.__getitem__, sprite_ids), positions), doreturn=False)
+
+
+system = ParticleSystem()
+
+def emit(name, x, y):
+    if system.enabled:
+        system.emit(name, x, y)
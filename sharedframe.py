@@ -0,0 +1,96 @@
+import pickle
+import struct
+from multiprocessing import shared_memory, resource_tracker
+import pygame
+
+# Shared memory double buffer for the --split mode. The simulation process writes each
+# frame's state into the slot readers are not looking at, then flips the header to it;
+# any number of render processes (the game window, spectators) read the newest complete
+# frame. Each slot carries a sequence number that is odd while it is being written, so a
+# reader that loses the race to a fast writer just retries instead of drawing a torn frame.
+HEADER = struct.Struct("<qqq")        # newest frame number, slot it is in, simulation closed flag
+SLOT_HEADER = struct.Struct("<qq")    # write sequence (odd while writing), payload size
+KEY_BYTES = 512                       # pygame.key.get_pressed() of the window that owns the keyboard
+SLOT_SIZE = 1 << 20
+READ_RETRIES = 3
+
+
+class FrameBuffer:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        self.frame = 0
+        self.last_read = 0
+
+    @classmethod
+    def create(cls):
+        size = HEADER.size + KEY_BYTES + 2 * SLOT_SIZE
+        return cls(shared_memory.SharedMemory(create=True, size=size), owner=True)
+
+    @classmethod
+    def attach(cls, name, untrack=False):
+        """Open an existing buffer. Child processes share the creator's resource tracker; unrelated
+        processes (spectators) pass untrack=True, or their tracker would unlink the buffer when they exit"""
+        shm = shared_memory.SharedMemory(name)
+        if untrack:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def slot_offset(self, slot):
+        return HEADER.size + KEY_BYTES + slot * SLOT_SIZE
+
+    def publish(self, state):
+        """Writer side: store state as the newest frame"""
+        data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        if len(data) > SLOT_SIZE - SLOT_HEADER.size:
+            raise ValueError(f"Frame state of {len(data)} bytes does not fit a {SLOT_SIZE} byte slot")
+        self.frame += 1
+        slot = self.frame % 2
+        offset = self.slot_offset(slot)
+        seq = SLOT_HEADER.unpack_from(self.buf, offset)[0]
+        SLOT_HEADER.pack_into(self.buf, offset, seq + 1, len(data))
+        start = offset + SLOT_HEADER.size
+        self.buf[start:start + len(data)] = data
+        SLOT_HEADER.pack_into(self.buf, offset, seq + 2, len(data))
+        HEADER.pack_into(self.buf, 0, self.frame, slot, 0)
+
+    def read(self):
+        """Reader side: the newest frame's state, or None if nothing new was published since the last read"""
+        for _ in range(READ_RETRIES):
+            frame, slot, _ = HEADER.unpack_from(self.buf, 0)
+            if frame == self.last_read:
+                return None
+            offset = self.slot_offset(slot)
+            seq, size = SLOT_HEADER.unpack_from(self.buf, offset)
+            if seq % 2:
+                continue
+            start = offset + SLOT_HEADER.size
+            data = bytes(self.buf[start:start + size])
+            if SLOT_HEADER.unpack_from(self.buf, offset)[0] == seq:
+                self.last_read = frame
+                return pickle.loads(data)
+        return None # The writer kept lapping us; the next read will catch up
+
+    def mark_closed(self):
+        frame, slot, _ = HEADER.unpack_from(self.buf, 0)
+        HEADER.pack_into(self.buf, 0, frame, slot, 1)
+
+    def closed(self):
+        return HEADER.unpack_from(self.buf, 0)[2] == 1
+
+    def write_keys(self, pressed):
+        self.buf[HEADER.size:HEADER.size + len(pressed)] = bytes(pressed)
+
+    def read_keys(self):
+        return pygame.key.ScancodeWrapper(map(bool, self.buf[HEADER.size:HEADER.size + KEY_BYTES]))
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,55 @@
+# Uniform grid broadphase. Players share one grid per frame instead of each of them
+# scanning every platform, coin and enemy, so the per-player cost depends only on
+# what is near them.
+CELL_SIZE = 64
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def insert(self, order, item, rect):
+        """Add item covering rect. order is its index in the source list, used to keep query order stable"""
+        cs = self.cell_size
+        entry = (order, item)
+        for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+            for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                self.cells.setdefault((cx, cy), []).append(entry)
+
+    def query(self, rect):
+        """Items whose cells overlap rect, in source list order (callers still do the exact rect test)"""
+        cs = self.cell_size
+        found = {}
+        for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+            for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                for entry in self.cells.get((cx, cy), ()):
+                    found[id(entry[1])] = entry
+        return [item for _, item in sorted(found.values(), key=lambda entry: entry[0])]
+
+    @classmethod
+    def build(cls, items, cell_size=CELL_SIZE):
+        grid = cls(cell_size)
+        for order, item in enumerate(items):
+            grid.insert(order, item, item.rect)
+        return grid
+
+
+class Broadphase:
+    """Per-frame collision candidates shared by every player.
+    Platforms come from the level's tilemap; coins and enemies are re-bucketed once per frame."""
+    def __init__(self, tilemap, coins, enemies):
+        self.tilemap = tilemap
+        self.coin_grid = SpatialGrid.build(coins)
+        self.enemy_grid = SpatialGrid.build(enemies)
+        self.broken = [] # Breakable platforms hit this frame, removed by the game after the player updates
+
+    def platforms_near(self, rect, margin_x, margin_y):
+        # Collision pushes can move a body by up to its own size, so look a little further out
+        return self.tilemap.query(rect.inflate(margin_x * 2, margin_y * 2))
+
+    def coins_near(self, rect):
+        return self.coin_grid.query(rect)
+
+    def enemies_near(self, rect):
+        return self.enemy_grid.query(rect)
@@ -0,0 +1,17 @@
+import os
+import atlas
+import main
+
+
+def test_hash_follows_constants_the_builders_read(monkeypatch):
+    before = atlas.content_hash(main.atlas_entries(), main.ATLAS_SOURCES)
+    monkeypatch.setattr(main, "COIN_YELLOW", (250, 190, 0))
+    assert atlas.content_hash(main.atlas_entries(), main.ATLAS_SOURCES) != before
+
+
+def test_bake_leaves_only_the_image_and_index(tmp_path):
+    main.init_subsystems()
+    atlas.bake(main.atlas_entries(), main.ATLAS_SOURCES, str(tmp_path))
+    index = atlas.bake(main.atlas_entries(), main.ATLAS_SOURCES, str(tmp_path)) # Rebaking over an existing atlas
+    assert sorted(os.listdir(tmp_path)) == sorted([index["image"], atlas.INDEX_NAME])
+    assert atlas.read_index(str(tmp_path)) == index
@@ -0,0 +1,42 @@
+import os
+import pygame
+import pytest
+import audio
+
+
+@pytest.fixture
+def engine():
+    engine = audio.AudioEngine(pool_size=2)
+    if not engine.init():
+        pytest.skip("no mixer, even with the dummy audio driver")
+    engine.preload()
+    yield engine
+    engine.stop()
+    pygame.mixer.quit()
+
+
+def test_free_channels_are_used_before_stealing(engine):
+    engine.play('respawn')
+    assert engine.free_channel() == 1
+    engine.play('respawn')
+    assert engine.started == [1, 2]
+
+
+def test_full_pool_steals_the_oldest_voice(engine):
+    for _ in range(2):
+        engine.play('respawn')
+    if not all(channel.get_busy() for channel in engine.channels):
+        pytest.skip("audio driver finished the sounds already")
+    engine.play('coin')
+    assert engine.started == [3, 2]
+    engine.play('coin')
+    assert engine.started == [3, 4]
+
+
+def test_music_is_only_started_once_prepared(engine, tmp_path):
+    directory = str(tmp_path)
+    assert not engine.start_music(directory) # Never synthesises on the calling thread
+    engine.prepare_music(directory)
+    assert os.listdir(directory) == [audio.MUSIC_FILE]
+    assert engine.start_music(directory)
+    assert engine.music_playing
@@ -0,0 +1,18 @@
+import levelgen
+
+
+def test_boss_on_the_ground_avoids_low_platforms():
+    for seed in range(40):
+        for level_num in (10, 15, 20, 25, 30):
+            layout = levelgen.generate(level_num, seed)
+            boss = layout["boss"]
+            rect = (boss["x"], boss["y"], boss["width"], boss["height"])
+            assert not any(levelgen._overlaps(rect, p) for p in layout["platforms"])
+
+
+def test_validate_rejects_spawns_inside_platforms():
+    layout = levelgen.staircase(8)
+    assert levelgen.validate(layout)
+    x, top, _, _ = layout["platforms"][0]
+    layout["boss"] = {"x": x, "y": top - 40, "width": 72, "height": 72, "health": 30}
+    assert not levelgen.validate(layout)
@@ -0,0 +1,38 @@
+import main
+
+
+def finish_level(game):
+    game.set_entities([], [])
+    game.update()
+    assert game.level_complete
+
+
+def test_level_prefetches_do_not_pile_up():
+    game = main.Game(audio_enabled=False, player_specs=["bot"], endless=True, seed=1)
+    game.title_screen = False
+    game.setup_level(1)
+    for _ in range(8):
+        finish_level(game)
+        game.current_level += 1 # NEXT
+        game.setup_level(game.current_level)
+        assert set(game.level_futures) <= {game.current_level + 1}
+    finish_level(game)
+    game.setup_level(game.current_level) # RESTART keeps the next level's build for later
+    assert set(game.level_futures) == {game.current_level + 1}
+    game.level_loader.shutdown()
+
+
+def test_level_completes_on_the_frame_the_last_enemy_is_stomped():
+    game = main.Game(audio_enabled=False, player_specs=["bot"])
+    game.title_screen = False
+    game.setup_level(1)
+    enemy = main.Enemy(300, 500)
+    enemy.vel_x = 0
+    game.set_entities([], [enemy])
+    player = game.players[0]
+    player.input = main.inputs.RemoteInput("Test")
+    player.x, player.y, player.vel_y = 296, 500 - player.height - 4, 6 # Falling onto its head
+    game.update()
+    assert not enemy.alive
+    assert game.level_complete
+    game.level_loader.shutdown()
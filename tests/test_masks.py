@@ -0,0 +1,37 @@
+import pygame
+import pytest
+import inputs
+import main
+
+
+@pytest.fixture(autouse=True)
+def display():
+    main.init_subsystems()
+    pygame.display.set_mode((1, 1))
+
+
+def test_masks_follow_the_silhouette_not_the_rect():
+    player = main.Player(0, 0, main.MARIO_RED, inputs.RemoteInput("Test"), "P1")
+    for body in (player, main.Enemy(0, 0), main.Fireball(0, 0, 0, 0)):
+        mask = body.collision_mask()[0]
+        assert 0 < mask.count() < body.width * body.height
+
+
+def test_corner_graze_from_below_is_a_miss():
+    """Jumping so the player's head corner clips the enemy's bottom corner used to cost a life"""
+    enemy = main.Enemy(200, 300)
+    enemy.vel_x = 0
+    player = main.Player(0, 0, main.MARIO_RED, inputs.RemoteInput("Test"), "P1")
+    # After this frame's move the rects overlap by 2x2px: player's top-right, enemy's bottom-left
+    player.x, player.y, player.vel_y = 202 - player.width, 331.2, -10
+    player.update([], [], [enemy])
+    assert player.lives == 3
+    assert player.rect.clip(enemy.rect).size == (2, 2)
+
+
+def test_body_contact_still_hits():
+    enemy = main.Enemy(200, 300)
+    player = main.Player(0, 0, main.MARIO_RED, inputs.RemoteInput("Test"), "P1")
+    player.x, player.y, player.vel_y = 190, 290, 0
+    player.update([], [], [enemy])
+    assert player.lives == 2
@@ -0,0 +1,63 @@
+import pytest
+import main
+from tilemap import Tilemap
+
+
+class ScriptedInput:
+    """Presses jump on the given frames and nothing else"""
+    label = "Script"
+
+    def __init__(self, jump_frames=()):
+        self.jump_frames = set(jump_frames)
+        self.frame = 0
+
+    def actions(self, player, coins, enemies):
+        self.frame += 1
+        return False, False, self.frame in self.jump_frames
+
+
+@pytest.fixture
+def game():
+    game = main.Game(audio_enabled=False, player_specs=["bot"])
+    game.title_screen = False
+    yield game
+    game.level_loader.shutdown()
+
+
+def play(game, platforms, jump_frames=()):
+    """One player on the ground under the given platforms; a far-off coin keeps the level running"""
+    game.platforms = platforms
+    game.tilemap = Tilemap.build(platforms, main.SCREEN_WIDTH, main.SCREEN_HEIGHT)
+    game.set_entities([main.Coin(1000, 100)], [])
+    player = game.players[0]
+    player.input = ScriptedInput(jump_frames)
+    player.reset_for_level()
+    player.x, player.y = 310, main.SCREEN_HEIGHT - 50 - player.height
+    player.rect.topleft = (player.x, player.y)
+    return player
+
+
+def test_one_way_platform_is_jumped_through_and_stood_on(game):
+    plank = main.Platform(300, 600, 96, 16, main.ONE_WAY)
+    player = play(game, [plank], jump_frames=[2])
+    rose_above = False
+    for _ in range(60):
+        game.update()
+        rose_above = rose_above or player.rect.bottom < plank.rect.top
+    assert rose_above
+    for _ in range(120):
+        game.update()
+        assert player.on_ground or player.rect.bottom >= plank.rect.top - 1
+        assert player.rect.bottom <= plank.rect.top + 2
+    assert player.y + player.height == pytest.approx(plank.rect.top, abs=2)
+
+
+def test_breakable_platform_breaks_when_hit_from_below(game):
+    block = main.Platform(300, 600, 64, 16, main.BREAKABLE)
+    solid = main.Platform(600, 600, 64, 16)
+    player = play(game, [block, solid], jump_frames=[2])
+    for _ in range(30):
+        game.update()
+    assert block not in game.platforms
+    assert game.tilemap.query(block.rect) == []
+    assert game.platforms == [solid]
@@ -0,0 +1,31 @@
+import pickle
+import random
+import pygame
+import main
+
+
+def test_render_mirror_matches_simulation_and_reuses_objects():
+    random.seed(5)
+    sim = main.Game(audio_enabled=False, player_specs=["bot"] * 4)
+    ren = main.Game(audio_enabled=False)
+    sim.title_screen = False
+    sim.current_level = 5 # Turrets and the boss: fireballs and shockwaves to mirror
+    sim.setup_level(5)
+    rebuilds = 0
+    for frame in range(300):
+        sim.update()
+        if sim.is_idle():
+            break
+        enemies = ren.enemies
+        ren.apply_frame_state(pickle.loads(pickle.dumps(sim.frame_state())))
+        rebuilds += ren.enemies is not enemies
+        if frame % 50 == 0:
+            sim.draw_scene()
+            expected = pygame.image.tobytes(sim.screen, "RGB")
+            ren.draw_scene()
+            assert pygame.image.tobytes(ren.screen, "RGB") == expected
+    # Buckets are rebuilt for the first frame and when entities are removed, not every frame
+    assert rebuilds <= 1 + len(main.levels.entity_keys(sim.level_layout))
+    assert rebuilds < frame // 2
+    for game in (sim, ren):
+        game.level_loader.shutdown()
@@ -0,0 +1,102 @@
+import pygame
+
+# Level geometry indexed on a 16px tile grid. Every tile lists the platforms covering it,
+# so collision only looks at the tiles a body overlaps, however many platforms the level
+# has. Platforms are also baked into fixed-size render chunks: drawing the level is one
+# blit per non-empty chunk, and breaking a block only re-bakes the chunks it touched.
+TILE_SIZE = 16
+CHUNK_SIZE = 128
+CHUNK_COLORKEY = (255, 0, 255)
+
+
+class Tilemap:
+    def __init__(self, width, height, tile_size=TILE_SIZE, chunk_size=CHUNK_SIZE):
+        self.tile_size = tile_size
+        self.cols = -(-width // tile_size)
+        self.rows = -(-height // tile_size)
+        self.tiles = [None] * (self.cols * self.rows)
+        self.platforms = [] # Insertion order, which collision queries preserve
+        self.order = {}
+        self.next_order = 0
+        self.chunk_size = chunk_size
+        self.chunk_cols = -(-width // chunk_size)
+        self.chunk_rows = -(-height // chunk_size)
+        self.chunks = {}
+        self.dirty_chunks = set()
+
+    @classmethod
+    def build(cls, platforms, width, height):
+        tilemap = cls(width, height)
+        for platform in platforms:
+            tilemap.add(platform)
+        return tilemap
+
+    def tile_range(self, rect):
+        """Indices of the tiles rect overlaps, clipped to the map"""
+        ts = self.tile_size
+        col0, col1 = max(0, rect.left // ts), min(self.cols - 1, (rect.right - 1) // ts)
+        row0, row1 = max(0, rect.top // ts), min(self.rows - 1, (rect.bottom - 1) // ts)
+        return [row * self.cols + col for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
+
+    def add(self, platform):
+        self.order[id(platform)] = self.next_order
+        self.next_order += 1
+        self.platforms.append(platform)
+        for i in self.tile_range(platform.rect):
+            if self.tiles[i] is None:
+                self.tiles[i] = []
+            self.tiles[i].append(platform)
+        self.mark_dirty(platform)
+
+    def remove(self, platform):
+        for i in self.tile_range(platform.rect):
+            self.tiles[i] = [p for p in self.tiles[i] if p is not platform] or None
+        self.platforms.remove(platform)
+        del self.order[id(platform)]
+        self.mark_dirty(platform)
+
+    def query(self, rect):
+        """Platforms on the tiles rect overlaps, in insertion order (callers still do the exact rect test)"""
+        tiles = self.tiles
+        found = {}
+        for i in self.tile_range(rect):
+            if tiles[i]:
+                for platform in tiles[i]:
+                    found[id(platform)] = platform
+        if len(found) < 2:
+            return list(found.values())
+        order = self.order
+        return sorted(found.values(), key=lambda platform: order[id(platform)])
+
+    def chunk_range(self, rect):
+        cs = self.chunk_size
+        return [(cx, cy) for cy in range(max(0, rect.top // cs), min(self.chunk_rows - 1, (rect.bottom - 1) // cs) + 1)
+                for cx in range(max(0, rect.left // cs), min(self.chunk_cols - 1, (rect.right - 1) // cs) + 1)]
+
+    def mark_dirty(self, platform):
+        self.dirty_chunks.update(self.chunk_range(platform.draw_rect()))
+
+    def bake(self):
+        """Redraw the chunks whose platforms changed"""
+        cs = self.chunk_size
+        for cx, cy in self.dirty_chunks:
+            area = pygame.Rect(cx * cs, cy * cs, cs, cs)
+            platforms = [p for p in self.platforms if p.draw_rect().colliderect(area)]
+            if not platforms:
+                self.chunks.pop((cx, cy), None)
+                continue
+            chunk = self.chunks.get((cx, cy))
+            if chunk is None:
+                chunk = pygame.Surface((cs, cs))
+                chunk.set_colorkey(CHUNK_COLORKEY)
+                self.chunks[(cx, cy)] = chunk
+            chunk.fill(CHUNK_COLORKEY)
+            for platform in platforms:
+                platform.draw(chunk, (-area.x, -area.y))
+        self.dirty_chunks.clear()
+
+    def draw(self, screen):
+        if self.dirty_chunks:
+            self.bake()
+        cs = self.chunk_size
+        screen.blits([(chunk, (cx * cs, cy * cs)) for (cx, cy), chunk in self.chunks.items()], doreturn=False)
@@ -0,0 +1,72 @@
+import pygame
+
+# Retained-mode menu widgets. A menu's widgets are built once when the menu appears, and
+# the same objects answer hit-tests and draw themselves, so the two can never disagree.
+# Everything static is baked into the layer's background; after the first frame only the
+# widgets whose hover or content changed are redrawn and pushed to the display.
+BORDER_WIDTH = 4
+
+
+class Button:
+    def __init__(self, name, rect, label, fill, border, hover_border):
+        self.name = name
+        self.rect = pygame.Rect(rect)
+        self.label = label # Pre-rendered text surface
+        self.fill = fill
+        self.border = border
+        self.hover_border = hover_border
+        self.hovered = False
+        self.dirty = True
+
+    def set_hovered(self, hovered):
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.dirty = True
+
+    def draw(self, screen):
+        pygame.draw.rect(screen, self.fill, self.rect)
+        pygame.draw.rect(screen, self.hover_border if self.hovered else self.border, self.rect, BORDER_WIDTH)
+        screen.blit(self.label, self.label.get_rect(center=self.rect.center))
+        self.dirty = False
+
+
+class UILayer:
+    def __init__(self, widgets=()):
+        self.widgets = list(widgets)
+        self.background = None # Set by the first draw; hit-testing works without it
+        self.full_redraw = True
+
+    def set_background(self, background):
+        self.background = background
+        self.full_redraw = True
+
+    def widget_at(self, pos):
+        for widget in self.widgets:
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def hover(self, pos):
+        hovered = self.widget_at(pos)
+        for widget in self.widgets:
+            widget.set_hovered(widget is hovered)
+
+    def invalidate(self):
+        """Redraw everything next frame (the window was exposed or restored)"""
+        self.full_redraw = True
+
+    def draw(self, screen):
+        """Draw what changed; returns the screen rects to update, empty when nothing did"""
+        if self.full_redraw:
+            screen.blit(self.background, (0, 0))
+            for widget in self.widgets:
+                widget.draw(screen)
+            self.full_redraw = False
+            return [screen.get_rect()]
+        dirty = []
+        for widget in self.widgets:
+            if widget.dirty:
+                screen.blit(self.background, widget.rect, widget.rect)
+                widget.draw(screen)
+                dirty.append(widget.rect)
+        return dirty